@@ -0,0 +1,366 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def group_starts(codes: np.ndarray) -> np.ndarray:
+    """
+    Start offsets of each contiguous run of equal codes.
+
+    Args:
+        codes: ts_code array (or its integer category codes) of a frame sorted
+            by ['ts_code', 'trade_date'].
+
+    Returns:
+        int64 array with the first row position of every group.
+    """
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+
+class GroupIndex:
+    """
+    Contiguous ts_code groups of a panel sorted by ['ts_code', 'trade_date'].
+
+    Attributes:
+        codes: ts_code values (or integer category codes) in row order.
+        starts: First row position of every group.
+        ends: One past the last row position of every group.
+        positions: Position of every row inside its group (groupby().cumcount()).
+    """
+
+    def __init__(self, codes: np.ndarray):
+        n = len(codes)
+        self.codes = codes
+        self.starts = group_starts(codes)
+        self.ends = np.r_[self.starts[1:], n].astype(np.int64)
+        self.positions = np.arange(n) - np.repeat(self.starts, self.ends - self.starts)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def ts_code_codes(df: pd.DataFrame) -> np.ndarray:
+    """
+    ts_code as an array that is cheap to compare row against row.
+
+    A categorical ts_code (as set up by the daily factor driver) yields its
+    integer codes, so group boundaries are found with integer equality
+    instead of Python string comparisons. Other dtypes are returned as is.
+    """
+    col = df['ts_code']
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return col.cat.codes.to_numpy()
+    return col.to_numpy()
+
+
+def _column_buffer(df: pd.DataFrame, column: str) -> np.ndarray:
+    # The array a column's values live in: the integer codes of a categorical,
+    # otherwise the column as a (for numpy dtypes zero-copy) ndarray
+    values = df[column].array
+    if isinstance(values, pd.Categorical):
+        return values.codes
+    return df[column].to_numpy()
+
+
+def _same_buffers(cached: tuple, current: tuple) -> bool:
+    # A cache entry holds on to the arrays it was built from, so their memory
+    # cannot be freed and reused: the same data address means the same buffer.
+    # Columns that are not backed by a numpy buffer (e.g. arrow strings) come
+    # out as a fresh copy every time and are compared by content instead.
+    for old, new in zip(cached, current):
+        if old.shape != new.shape or old.dtype != new.dtype:
+            return False
+        if (old.__array_interface__['data'][0] == new.__array_interface__['data'][0]
+                and old.strides == new.strides):
+            continue
+        if old.dtype != object or not np.array_equal(old, new):
+            return False
+    return True
+
+
+# Per live DataFrame, keyed by id(df) and dropped when the frame is collected:
+# name -> (source column buffers, cached value)
+_FRAME_CACHE = {}
+
+
+def _frame_cached(df: pd.DataFrame, key: str, columns: list, compute):
+    frame_key = id(df)
+    entry = _FRAME_CACHE.get(frame_key)
+    if entry is None:
+        entry = _FRAME_CACHE[frame_key] = {}
+        weakref.finalize(df, _FRAME_CACHE.pop, frame_key, None)
+    buffers = tuple(_column_buffer(df, column) for column in columns)
+    cached = entry.get(key)
+    if cached is not None and _same_buffers(cached[0], buffers):
+        return cached[1]
+    value = compute(df)
+    entry[key] = (buffers, value)
+    return value
+
+
+def group_index(df: pd.DataFrame) -> GroupIndex:
+    """
+    Get (or build and cache) the GroupIndex of a sorted panel.
+
+    The pipeline passes the same sorted frame to every factor, so the group
+    boundaries are computed once and shared instead of every factor paying
+    for its own groupby('ts_code') setup. The cached GroupIndex is rebuilt
+    once the ts_code column no longer lives in the buffer it was built from
+    (the column was replaced or the frame re-sorted in place).
+
+    Args:
+        df: Frame sorted by ['ts_code', 'trade_date'].
+
+    Returns:
+        GroupIndex of df.
+    """
+    return _frame_cached(df, '_group_index', ['ts_code'],
+                         lambda df: GroupIndex(ts_code_codes(df)))
+
+
+def cached_on_frame(df: pd.DataFrame, key: str, columns: list, compute):
+    """
+    Get (or compute and cache) a named intermediate of a panel.
+
+    Lets sibling factors share a base indicator (e.g. OBV) built from the same
+    frame instead of each recomputing it. The entry is only reused while every
+    column it is built from still lives in the same buffer, so replacing one
+    of them (df['close'] = ...) or re-sorting the frame in place recomputes
+    it. Writes into the existing buffer (df.loc[i, 'close'] = ...) are not
+    detected. The cached array is made read-only so that no caller can
+    modify it for the others.
+
+    Args:
+        df: Input frame.
+        key: Name of the intermediate.
+        columns: Columns of df the intermediate is computed from.
+        compute: Callable taking df and returning an ndarray of len(df).
+
+    Returns:
+        The cached ndarray.
+    """
+    def _compute(df: pd.DataFrame) -> np.ndarray:
+        values = compute(df)
+        values.flags.writeable = False
+        return values
+
+    return _frame_cached(df, key, columns, _compute)
+
+
+def shift_sorted(values: np.ndarray, periods: int, groups: GroupIndex) -> np.ndarray:
+    """
+    Group-aware shift on a sorted panel without a pandas groupby.
+
+    Equivalent to df.groupby('ts_code')[col].shift(periods) for periods >= 0
+    when the frame is sorted by ['ts_code', 'trade_date'].
+
+    Args:
+        values: Column values in sorted order.
+        periods: Number of rows to shift forward.
+        groups: GroupIndex of the frame.
+
+    Returns:
+        float64 array with NaN where the lag falls outside the group.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if periods == 0:
+        out[:] = values
+        return out
+    if periods < len(values):
+        out[periods:] = values[:-periods]
+        out[groups.positions < periods] = np.nan
+    return out
+
+
+def cumsum_sorted(values: np.ndarray, groups: GroupIndex, skipna: bool = True) -> np.ndarray:
+    """
+    Group-aware cumulative sum on a sorted panel.
+
+    Equivalent to df.groupby('ts_code')[col].cumsum(skipna=skipna): with skipna
+    NaN rows stay NaN and are skipped by the running total, without it a NaN
+    carries through to the end of its stock. Each group is one contiguous
+    slice, so the sum runs as a single sequential np.cumsum per stock with no
+    groupby dispatch and no cross-group accumulation error.
+
+    Args:
+        values: Column values in sorted order.
+        groups: GroupIndex of the frame.
+        skipna: Skip NaN rows instead of propagating them.
+
+    Returns:
+        float64 array of running totals.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if skipna:
+        missing = np.isnan(values)
+        values = np.where(missing, 0.0, values)
+    out = np.empty_like(values)
+    for start, end in zip(groups.starts, groups.ends):
+        np.cumsum(values[start:end], out=out[start:end])
+    if skipna:
+        out[missing] = np.nan
+    return out
+
+
+def ffill_sorted(values: np.ndarray, groups: GroupIndex) -> np.ndarray:
+    """
+    Group-aware forward fill on a sorted panel.
+
+    Equivalent to df.groupby('ts_code')[col].ffill(): every NaN takes the last
+    non-NaN value of the same stock, and stays NaN if there is none.
+
+    Args:
+        values: Column values in sorted order.
+        groups: GroupIndex of the frame.
+
+    Returns:
+        float64 array with NaN forward-filled within groups.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    last_valid = np.where(~np.isnan(values), np.arange(n), -1)
+    np.maximum.accumulate(last_valid, out=last_valid)
+    row_start = np.repeat(groups.starts, groups.ends - groups.starts)
+    filled = last_valid >= row_start
+    out = np.full(n, np.nan)
+    out[filled] = values[last_valid[filled]]
+    return out
+
+
+def rolling_sorted(values: np.ndarray, groups: GroupIndex, window: int,
+                   how: str = 'mean', min_periods: int = None, **kwargs) -> np.ndarray:
+    """
+    Group-aware rolling aggregation on a sorted panel in a single pass.
+
+    Equivalent to df.groupby('ts_code')[col].rolling(window, min_periods).<how>()
+    for a frame sorted by ['ts_code', 'trade_date'], but runs one flat pandas
+    rolling kernel over the whole column instead of one per group. When
+    min_periods == window, windows that reach into the previous group are
+    masked out afterwards; otherwise window - 1 NaN rows are inserted between
+    groups so that no window can see another stock.
+
+    Args:
+        values: Column values in sorted order.
+        groups: GroupIndex of the frame.
+        window: Rolling window length.
+        how: Rolling aggregation name ('mean', 'sum', 'max', 'min', 'std', 'rank', ...).
+        min_periods: Minimum observations in window (default: window).
+        **kwargs: Passed to the aggregation (e.g. pct=True for 'rank').
+
+    Returns:
+        float64 array of rolling results.
+    """
+    if min_periods is None:
+        min_periods = window
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    if min_periods >= window:
+        out = getattr(pd.Series(values).rolling(window, min_periods=min_periods), how)(**kwargs).to_numpy()
+        return np.where(groups.positions < window - 1, np.nan, out)
+
+    pad = window - 1
+    idx = np.arange(n) + np.repeat(np.arange(len(groups.starts)) * pad, groups.ends - groups.starts)
+    padded = np.full(n + pad * (len(groups.starts) - 1), np.nan)
+    padded[idx] = values
+    out = getattr(pd.Series(padded).rolling(window, min_periods=min_periods), how)(**kwargs).to_numpy()
+    return out[idx]
+
+
+def rolling_slope_sorted(values: np.ndarray, groups: GroupIndex, window: int) -> np.ndarray:
+    """
+    Group-aware rolling OLS slope of values against time on a sorted panel.
+
+    Same result as fitting np.polyfit(np.arange(window), y, 1)[0] on every full
+    window of every stock, but in closed form:
+    slope = sum((x - x_mean) * y) / sum((x - x_mean) ** 2) with x = 0..window-1
+    measured from the start of each window. The centred x and the constant
+    denominator window * (window**2 - 1) / 12 make this one sliding weighted
+    sum with fixed weights (x - x_mean) / denominator, so no large,
+    nearly equal sums are subtracted.
+
+    Args:
+        values: Column values in sorted order.
+        groups: GroupIndex of the frame.
+        window: Regression window length (>= 2).
+
+    Returns:
+        float64 array of slopes, NaN where the window is incomplete or has NaN.
+    """
+    x = np.arange(window, dtype=np.float64)
+    weights = (x - (window - 1) / 2) / (window * (window ** 2 - 1) / 12)
+    return sliding_wma_sorted(values, weights, groups)
+
+
+def sliding_wma_sorted(values: np.ndarray, weights: np.ndarray, groups: GroupIndex) -> np.ndarray:
+    """
+    Group-aware weighted moving sum of values on a sorted panel.
+
+    One dot product of every len(weights)-row window of the whole panel with
+    weights, then windows that reach into the previous stock are masked out.
+    weights[0] applies to the oldest row of the window, weights[-1] to the
+    current one; they are used as given, so pass normalised weights for a WMA.
+
+    Args:
+        values: Column values in sorted order.
+        weights: 1-D window weights, oldest first.
+        groups: GroupIndex of the frame.
+
+    Returns:
+        float64 array, NaN where the window is incomplete or holds a NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    window = len(weights)
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window) @ weights
+    out[groups.positions < window - 1] = np.nan
+    return out
+
+
+def is_sorted_panel(df: pd.DataFrame) -> bool:
+    """
+    Check whether a frame is already sorted by ['ts_code', 'trade_date'].
+
+    A linear scan, much cheaper than re-sorting a panel that is already in order.
+    """
+    if not df['ts_code'].is_monotonic_increasing:
+        return False
+    codes = ts_code_codes(df)
+    dates = df['trade_date'].to_numpy()
+    same_code = codes[1:] == codes[:-1]
+    return bool((dates[1:][same_code] > dates[:-1][same_code]).all())
+
+
+def date_code_frame(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    """
+    Build a daily factor result indexed by ['trade_date', 'ts_code'] in index order.
+
+    Same frame as pd.DataFrame({**columns, 'trade_date': df['trade_date'],
+    'ts_code': df['ts_code']}).set_index(['trade_date', 'ts_code']).sort_index()
+    for a frame sorted by ['ts_code', 'trade_date']: within one trade_date its
+    rows are already in ts_code order, so a single stable argsort of the dates
+    gives the final row order and the MultiIndex is built directly from the
+    reordered key columns, without set_index and a MultiIndex sort.
+
+    Args:
+        df: Frame sorted by ['ts_code', 'trade_date'].
+        columns: Factor name -> values in row order of df.
+
+    Returns:
+        DataFrame of the factor columns indexed by ['trade_date', 'ts_code'].
+    """
+    order = np.argsort(df['trade_date'].to_numpy(), kind='stable')
+    index = pd.MultiIndex.from_arrays(
+        [df['trade_date'].take(order), df['ts_code'].take(order)],
+        names=['trade_date', 'ts_code']
+    )
+    return pd.DataFrame({name: np.asarray(values)[order] for name, values in columns.items()}, index=index)
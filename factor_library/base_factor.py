@@ -3,6 +3,11 @@ from abc import ABC, abstractmethod
 import pandas as pd
 from typing import List
 
+from ._utils import is_sorted_panel
+
+# Row order every time-series factor works in
+SORT_KEYS = ['ts_code', 'trade_date']
+
 class BaseFactor(ABC):
     """
     Abstract base class for all factors.
@@ -36,6 +41,18 @@ class BaseFactor(ABC):
         if missing:
             raise ValueError(f"Missing required columns for factor {self.name}: {missing}")
             
+    def _ensure_sorted(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return df sorted by ['ts_code', 'trade_date'].
+        
+        The pipeline sorts the daily panel once before running all factors,
+        so the (copying) sort is skipped when a linear scan finds the frame
+        already in order.
+        """
+        if not is_sorted_panel(df):
+            df = df.sort_values(SORT_KEYS)
+        return df
+            
     @abstractmethod
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         """
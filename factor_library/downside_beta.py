@@ -68,7 +68,7 @@ class DownsideRiskBeta(BaseFactor):
         # 月度收益率 = (1 + r1) * (1 + r2) * ... * (1 + rn) - 1
         
         # 股票月度收益率
-        monthly_stock_returns = df.groupby(['ts_code', 'year_month'])['ret'].apply(
+        monthly_stock_returns = df.groupby(['ts_code', 'year_month'], observed=True)['ret'].apply(
             lambda x: (1 + x).prod() - 1
         ).reset_index()
         monthly_stock_returns.columns = ['ts_code', 'year_month', 'monthly_ret']
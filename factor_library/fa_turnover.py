@@ -2,7 +2,6 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
-from scripts.utils.financial_utils import convert_ytd_to_ttm
 
 class FATurnover(BaseFactor):
     """
@@ -143,12 +143,19 @@ class AdjustedBetaFP:
         market_df = market_df.sort_values('trade_date').copy()
         market_df['overlapping_return'] = market_df['log_return'].rolling(window=3, min_periods=3).sum() / 3
         
+        # σ_m 对所有股票相同，只在市场序列上计算一次，再按交易日广播到每只股票
+        market_df['volatility'] = self._calculate_volatility(
+            market_df['log_return'],
+            self.volatility_window_days
+        )
+        
         # 将市场数据与股票数据合并
         stock_df = stock_df.merge(
-            market_df[['trade_date', 'log_return', 'overlapping_return']].rename(
+            market_df[['trade_date', 'log_return', 'overlapping_return', 'volatility']].rename(
                 columns={
                     'log_return': 'market_log_return',
-                    'overlapping_return': 'market_overlapping_return'
+                    'overlapping_return': 'market_overlapping_return',
+                    'volatility': 'market_volatility'
                 }
             ),
             on='trade_date',
@@ -167,11 +174,8 @@ class AdjustedBetaFP:
                 self.volatility_window_days
             )
             
-            # 2. 计算 σ_m: 市场过去K个月的波动率
-            sigma_m = self._calculate_volatility(
-                group['market_log_return'], 
-                self.volatility_window_days
-            )
+            # 2. σ_m: 市场过去K个月的波动率（已在循环外预先计算）
+            sigma_m = group['market_volatility']
             
             # 3. 计算 ρ_im: 过去Y年使用重叠收益率的相关系数
             rho_im = self._calculate_correlation(
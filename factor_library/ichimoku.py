@@ -2,6 +2,27 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import group_index, rolling_sorted
+
+def compute_midline(df: pd.DataFrame, window: int) -> np.ndarray:
+    """
+    Calculate an Ichimoku midline: (Highest High + Lowest Low) / 2 over the past window periods.
+    
+    Tenkan-sen (9), Kijun-sen (26) and the unshifted Senkou Span B (52).
+    Shared by Ichimoku and the Ichimoku signal factors.
+    
+    Args:
+        df: Daily dataframe with 'high', 'low', sorted by ['ts_code', 'trade_date'].
+        window: Lookback period
+        
+    Returns:
+        Midline array, NaN during the warm-up period.
+    """
+    groups = group_index(df)
+    period_high = rolling_sorted(df['high'].to_numpy(), groups, window, how='max')
+    period_low = rolling_sorted(df['low'].to_numpy(), groups, window, how='min')
+    return (period_high + period_low) / 2
+
 
 class Ichimoku(BaseFactor):
     """
@@ -31,27 +52,23 @@ class Ichimoku(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         window = 26
         
         # Calculate Kijun-sen (Base Line)
         # (Highest High + Lowest Low) / 2 over past 26 periods
-        
-        rolling = df.groupby('ts_code')[['high', 'low']].rolling(window)
-        period_high = rolling['high'].max().reset_index(0, drop=True)
-        period_low = rolling['low'].min().reset_index(0, drop=True)
-        
-        kijun_sen = (period_high + period_low) / 2
+        kijun_sen = compute_midline(df, window)
         
         # Factor: (Close - Kijun_sen) / Close
         # Normalize to make it comparable across price levels
         # Fix: Return percentage deviation
-        factor_value = (df['close'] - kijun_sen) / df['close']
+        close = df['close'].to_numpy()
+        factor_value = (close - kijun_sen) / close
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: factor_value,
+            self.name: pd.Series(factor_value, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from .ichimoku import compute_midline
+from ._utils import group_index, shift_sorted
 
 class IchimokuCloudTrend(BaseFactor):
     """
@@ -34,31 +36,26 @@ class IchimokuCloudTrend(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Calculate Tenkan-sen (Conversion Line): 9-period
-        rolling_9 = df.groupby('ts_code')[['high', 'low']].rolling(9)
-        tenkan_high = rolling_9['high'].max().reset_index(0, drop=True)
-        tenkan_low = rolling_9['low'].min().reset_index(0, drop=True)
-        tenkan_sen = (tenkan_high + tenkan_low) / 2
+        tenkan_sen = compute_midline(df, 9)
         
         # Calculate Kijun-sen (Base Line): 26-period
-        rolling_26 = df.groupby('ts_code')[['high', 'low']].rolling(26)
-        kijun_high = rolling_26['high'].max().reset_index(0, drop=True)
-        kijun_low = rolling_26['low'].min().reset_index(0, drop=True)
-        kijun_sen = (kijun_high + kijun_low) / 2
+        kijun_sen = compute_midline(df, 26)
         
         # Calculate Senkou Span A: (Tenkan + Kijun) / 2, shifted forward 26 periods
-        senkou_span_a = ((tenkan_sen + kijun_sen) / 2).shift(26)
+        # Shift on the sorted arrays so the lag never crosses a ts_code boundary
+        groups = group_index(df)
+        span_a = (tenkan_sen + kijun_sen) * 0.5
+        senkou_span_a = shift_sorted(span_a, 26, groups)
         
         # Calculate Senkou Span B: 52-period, shifted forward 26 periods
-        rolling_52 = df.groupby('ts_code')[['high', 'low']].rolling(52)
-        senkou_b_high = rolling_52['high'].max().reset_index(0, drop=True)
-        senkou_b_low = rolling_52['low'].min().reset_index(0, drop=True)
-        senkou_span_b = ((senkou_b_high + senkou_b_low) / 2).shift(26)
+        span_b = compute_midline(df, 52)
+        senkou_span_b = shift_sorted(span_b, 26, groups)
         
         # Calculate cloud trend score
-        factor_value = (senkou_span_a > senkou_span_b).astype(int)
+        factor_value = (senkou_span_a > senkou_span_b).astype(np.int8)
         
         # Prepare result
         result = pd.DataFrame({
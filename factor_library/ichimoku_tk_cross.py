@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from .ichimoku import compute_midline
 
 class IchimokuTKCross(BaseFactor):
     """
@@ -34,22 +35,16 @@ class IchimokuTKCross(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Calculate Tenkan-sen (Conversion Line): 9-period
-        rolling_9 = df.groupby('ts_code')[['high', 'low']].rolling(9)
-        tenkan_high = rolling_9['high'].max().reset_index(0, drop=True)
-        tenkan_low = rolling_9['low'].min().reset_index(0, drop=True)
-        tenkan_sen = (tenkan_high + tenkan_low) / 2
+        tenkan_sen = compute_midline(df, 9)
         
         # Calculate Kijun-sen (Base Line): 26-period
-        rolling_26 = df.groupby('ts_code')[['high', 'low']].rolling(26)
-        kijun_high = rolling_26['high'].max().reset_index(0, drop=True)
-        kijun_low = rolling_26['low'].min().reset_index(0, drop=True)
-        kijun_sen = (kijun_high + kijun_low) / 2
+        kijun_sen = compute_midline(df, 26)
         
         # Calculate TK cross score
-        factor_value = np.where(tenkan_sen > kijun_sen, 1, -1)
+        factor_value = np.where(tenkan_sen > kijun_sen, 1, -1).astype(np.int8)
         
         # Prepare result
         result = pd.DataFrame({
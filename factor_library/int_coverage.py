@@ -25,7 +25,8 @@ class IntCoverage(BaseFactor):
         # Already converted to TTM in construct_fundamental_factors.py
         
         # Handle missing interest expense (assume 0 if missing)
-        int_exp = df['int_exp'].fillna(0)
+        int_exp = df['int_exp'].to_numpy(dtype=np.float64, na_value=0.0)
+        ocf = df['n_cashflow_act'].to_numpy(dtype=np.float64, na_value=np.nan)
         
         # Avoid division by zero
         # If int_exp is 0:
@@ -38,15 +39,16 @@ class IntCoverage(BaseFactor):
         zero_int_mask = (int_exp == 0)
         
         # Calculate ratio where int_exp != 0
-        factor_value = df['n_cashflow_act'] / int_exp
+        ratio = np.divide(ocf, int_exp, out=np.full(len(ocf), np.nan), where=~zero_int_mask)
         
         # Handle zero interest expense cases
         # If int_exp is 0 and OCF >= 0, it's very good (infinite coverage). Cap at 100.
-        factor_value.loc[zero_int_mask & (df['n_cashflow_act'] >= 0)] = 100
         # If int_exp is 0 and OCF < 0, it's bad (negative coverage). Cap at -100.
-        factor_value.loc[zero_int_mask & (df['n_cashflow_act'] < 0)] = -100
-        
-        factor_value = factor_value.replace([np.inf, -np.inf], np.nan)
+        factor_value = np.select(
+            [zero_int_mask & (ocf >= 0), zero_int_mask & (ocf < 0)],
+            [100.0, -100.0],
+            default=ratio
+        )
         
         result = pd.DataFrame({
             self.name: factor_value,
@@ -21,25 +21,25 @@ class InterestCoverageRatio(BaseFactor):
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         self.check_dependencies(df)
 
-        # Calculate Interest Coverage Ratio
         # Calculate Interest Coverage Ratio
         # Handle missing interest expense (assume 0 if missing)
-        int_exp = df['int_exp'].fillna(0)
+        int_exp = df['int_exp'].to_numpy(dtype=np.float64, na_value=0.0)
+        ebit = df['ebit'].to_numpy(dtype=np.float64, na_value=np.nan)
         
         # Create a mask for zero interest expense
         zero_int_mask = (int_exp == 0)
         
         # Calculate ratio where int_exp != 0
-        interest_coverage_ratio = df['ebit'] / int_exp
+        ratio = np.divide(ebit, int_exp, out=np.full(len(ebit), np.nan), where=~zero_int_mask)
         
         # Handle zero interest expense cases
         # If int_exp is 0 and EBIT >= 0, it's very good (infinite coverage). Cap at 100.
-        interest_coverage_ratio.loc[zero_int_mask & (df['ebit'] >= 0)] = 100
         # If int_exp is 0 and EBIT < 0, it's bad (negative coverage). Cap at -100.
-        interest_coverage_ratio.loc[zero_int_mask & (df['ebit'] < 0)] = -100
-
-        # Ensure numeric
-        interest_coverage_ratio = pd.to_numeric(interest_coverage_ratio, errors='coerce')
+        interest_coverage_ratio = np.select(
+            [zero_int_mask & (ebit >= 0), zero_int_mask & (ebit < 0)],
+            [100.0, -100.0],
+            default=ratio
+        )
 
         result = pd.DataFrame({
             self.name: interest_coverage_ratio,
@@ -1,7 +1,6 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
-from sklearn.linear_model import LinearRegression
 
 
 class IssuanceGrowthRate(BaseFactor):
@@ -24,34 +23,30 @@ class IssuanceGrowthRate(BaseFactor):
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         self.check_dependencies(df)
 
-        # Creating time variable t for the linear regression model
-        df['t'] = np.arange(len(df)) + 1  # time variable starting from 1
-
-        # Prepare data for linear regression
+        # Creating time variable t for the linear regression model (starting from 1)
         # Drop NaNs in total_share
-        valid_data = df.dropna(subset=['total_share'])
-        if valid_data.empty:
+        total_share = df['total_share'].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(total_share)
+        if not valid.any():
             return pd.DataFrame()
             
-        X = valid_data[['t']]  # Time variable
-        y = valid_data['total_share']  # Issuance (total share)
-
-        # Perform linear regression to get the slope β
-        model = LinearRegression()
-        model.fit(X, y)
+        t = np.arange(1, len(df) + 1, dtype=np.float64)[valid]  # Time variable
+        y = total_share[valid]  # Issuance (total share)
 
-        # Get the slope (β) from the model
-        beta = model.coef_[0]
+        # Closed-form OLS slope: β = cov(t, y) / var(t)
+        t_dev = t - t.mean()
+        ss_t = (t_dev ** 2).sum()
+        beta = (t_dev * (y - y.mean())).sum() / ss_t if ss_t > 0 else 0.0
 
         # Calculate the mean issuance over the period (mean of total shares)
-        mean_issuance = df['total_share'].mean()
+        mean_issuance = y.mean()
 
         # Calculate IGRO
         igro = -beta / mean_issuance
 
         # Return the result
         result = pd.DataFrame({
-            self.name: [igro] * len(df),
+            self.name: np.full(len(df), igro),
             'ts_code': df['ts_code'],
             'end_date': df['end_date']
         })
@@ -24,7 +24,13 @@ class LogMarketCap(BaseFactor):
         self.check_dependencies(df)
 
         # Calculate log of market capitalization
-        log_market_cap = np.log(df['close'] * df['total_shares'])
+        # Multiply and take the log in place on one buffer; non-positive caps become NaN
+        log_market_cap = df['close'].to_numpy(dtype=np.float64) * df['total_shares'].to_numpy(dtype=np.float64)
+        valid = log_market_cap > 0
+        np.log(log_market_cap, out=log_market_cap, where=valid)
+        log_market_cap[~valid] = np.nan
+        # float32 keeps ~7 significant digits, ample for a log value
+        log_market_cap = log_market_cap.astype(np.float32)
 
         result = pd.DataFrame({
             self.name: log_market_cap,
@@ -23,12 +23,14 @@ class Logffmv(BaseFactor):
         self.check_dependencies(df)
 
         # Free float market value
-        ffmv = df['close'] * df['free_share']
-
-        # Log transformation
-        factor_value = np.log(ffmv.replace(0, np.nan))
-
-        factor_value = factor_value.replace([np.inf, -np.inf], np.nan)
+        factor_value = df['close'].to_numpy(dtype=np.float64) * df['free_share'].to_numpy(dtype=np.float64)
+
+        # Log transformation (in place); zero or negative values become NaN
+        valid = factor_value > 0
+        np.log(factor_value, out=factor_value, where=valid)
+        factor_value[~valid] = np.nan
+        # float32 keeps ~7 significant digits, ample for a log value
+        factor_value = factor_value.astype(np.float32)
 
         result = pd.DataFrame({
             self.name: factor_value,
@@ -2,6 +2,7 @@
 import pandas as pd
 import numpy as np
 from factor_library.base_factor import BaseFactor
+from factor_library._utils import group_index, rolling_sorted
 
 class HighPrice52Week(BaseFactor):
     """
@@ -29,18 +30,21 @@ class HighPrice52Week(BaseFactor):
         """
         self.check_dependencies(df)
         
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # 52周 = 52 * 5 = 260个交易日（更精确）
         # 或使用 252 作为一年的交易日数（约定俗成）
         window = 260  # 52周的交易日数
         
         # 计算过去52周（包含当前）的最高价
-        # rolling(window).max() 会计算包含当前在内的window个交易日的最大值
-        max_52w = df.groupby('ts_code')['close'].rolling(window, min_periods=window).max().reset_index(0, drop=True)
+        # 在排序后的整列上做一次滚动最大值（单调队列，O(n)），再屏蔽跨股票的窗口，
+        # 避免逐组 groupby.rolling 的调度开销
+        close = df['close'].to_numpy(dtype=np.float64)
+        max_52w = rolling_sorted(close, group_index(df), window, how='max')
         
         # 计算52周最高价逼近度 = 当前收盘价 / 过去52周最高价
-        hp52w = df['close'] / max_52w
+        # 比值落在 (0, 1] 区间，float32 精度足够，下游内存减半
+        hp52w = (close / max_52w).astype(np.float32)
         
         # 构建结果DataFrame
         result = pd.DataFrame({
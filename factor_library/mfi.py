@@ -2,6 +2,51 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import group_index, rolling_sorted, shift_sorted
+
+def compute_mfi(df: pd.DataFrame, period: int = 14) -> np.ndarray:
+    """
+    Calculate basic MFI (Money Flow Index).
+    
+    Shared by MoneyFlowIndex, MFIChangeRate and MFIDivergence.
+    
+    Args:
+        df: Daily dataframe with 'high', 'low', 'close', 'vol', sorted by ['ts_code', 'trade_date'].
+        period: MFI calculation period
+        
+    Returns:
+        MFI array (0-100 range). 100 where the window has no negative flow,
+        NaN during the warm-up period.
+    """
+    groups = group_index(df)
+    
+    # Typical Price
+    tp = (df['high'].to_numpy() + df['low'].to_numpy() + df['close'].to_numpy()) / 3
+    
+    # Raw Money Flow
+    rmf = tp * df['vol'].to_numpy()
+    
+    # Previous Typical Price (within the same stock)
+    prev_tp = shift_sorted(tp, 1, groups)
+    
+    # Positive and Negative Money Flow
+    # If TP > Prev TP, flow is positive. If TP < Prev TP, flow is negative. Equal TP is discarded.
+    pos_flow = np.where(tp > prev_tp, rmf, 0.0)
+    neg_flow = np.where(tp < prev_tp, rmf, 0.0)
+    
+    # Rolling Sums
+    rolling_pos = rolling_sorted(pos_flow, groups, period, how='sum')
+    rolling_neg = rolling_sorted(neg_flow, groups, period, how='sum')
+    
+    # MFI = 100 - (100 / (1 + MFR)), MFR = Money Flow Ratio
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mfi = 100 - (100 / (1 + rolling_pos / rolling_neg))
+    
+    # If neg is 0, it means no negative moves. So MFI should be 100.
+    mfi[rolling_neg == 0] = 100
+    
+    return mfi
+
 
 class MoneyFlowIndex(BaseFactor):
     """
@@ -30,67 +75,21 @@ class MoneyFlowIndex(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         window = 14
         
-        # Typical Price
-        tp = (df['high'] + df['low'] + df['close']) / 3
-        
-        # Raw Money Flow
-        rmf = tp * df['vol']
-        
-        # Positive and Negative Money Flow
-        # We need previous TP to determine direction
-        prev_tp = df.groupby('ts_code')['close'].shift(1) # Using close shift just to align index, but we need shift of TP
-        # Actually better to shift TP itself
-        # But we can't easily shift a Series within groupby without apply or transform if we want to be safe about boundaries.
-        # However, since we sorted by ts_code and trade_date, we can just shift and mask.
-        # But let's use groupby shift for safety.
-        
-        # Re-calculate TP shift properly
-        # Since tp is a Series aligned with df, we can group it by df['ts_code']
-        prev_tp = tp.groupby(df['ts_code']).shift(1)
-        
-        # Direction
-        # If TP > Prev TP, flow is positive. If TP < Prev TP, flow is negative.
-        # If equal, discard? Standard MFI usually discards or treats as 0.
-        
-        pos_flow = pd.Series(0.0, index=df.index)
-        neg_flow = pd.Series(0.0, index=df.index)
+        mfi = compute_mfi(df, window)
         
-        pos_mask = tp > prev_tp
-        neg_mask = tp < prev_tp
-        
-        pos_flow[pos_mask] = rmf[pos_mask]
-        neg_flow[neg_mask] = rmf[neg_mask]
-        
-        # Rolling Sums
-        rolling_pos = pos_flow.groupby(df['ts_code']).rolling(window).sum().reset_index(0, drop=True)
-        rolling_neg = neg_flow.groupby(df['ts_code']).rolling(window).sum().reset_index(0, drop=True)
-        
-        # Money Flow Ratio
-        # Handle division by zero
-        mfr = rolling_pos / rolling_neg.replace(0, np.nan)
-        
-        # MFI = 100 - (100 / (1 + MFR))
-        mfi = 100 - (100 / (1 + mfr))
-        
-        # Fill NaNs where neg_flow was 0 (meaning MFR is infinite, MFI should be 100)
-        # If rolling_neg is 0 and rolling_pos > 0, MFI is 100.
-        # If both are 0, MFI is usually 50 or NaN. Let's leave as NaN or handle if needed.
+        # MFI is NaN during the warm-up window (and where there was no flow at all).
         # Fix: Fill with 50 (Neutral) or leave as NaN. 
         # The user requested: "Fill with 50 (Neutral) or leave as NaN".
         # Let's fill with 50 for stability in signals.
-        mfi = mfi.fillna(50) 
-        
-        # If neg is 0, it means no negative moves. So MFI should be 100.
-        mask_zero_neg = (rolling_neg == 0)
-        mfi[mask_zero_neg] = 100
+        mfi = np.where(np.isnan(mfi), 50.0, mfi)
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: mfi,
+            self.name: pd.Series(mfi, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -1,6 +1,7 @@
 import pandas as pd
-import numpy as np
 from .base_factor import BaseFactor
+from .mfi import compute_mfi
+from ._utils import group_index, shift_sorted
 
 class MFIChangeRate(BaseFactor):
     """
@@ -53,18 +54,18 @@ class MFIChangeRate(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Step 1: Calculate basic MFI
-        mfi = self._calculate_mfi(df, self.mfi_period)
+        mfi = compute_mfi(df, self.mfi_period)
         
         # Step 2: Calculate N-day change in MFI
         # MFI_Change_Nd = MFI(today) - MFI(N days ago)
-        mfi_change = mfi.groupby(df['ts_code']).diff(self.change_period)
+        mfi_change = mfi - shift_sorted(mfi, self.change_period, group_index(df))
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: mfi_change,
+            self.name: pd.Series(mfi_change, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -72,49 +73,3 @@ class MFIChangeRate(BaseFactor):
         result = result.set_index(['trade_date', 'ts_code']).sort_index()
         
         return result
-    
-    def _calculate_mfi(self, df: pd.DataFrame, period: int) -> pd.Series:
-        """
-        Calculate basic MFI (Money Flow Index).
-        
-        Args:
-            df: Input dataframe
-            period: MFI calculation period
-            
-        Returns:
-            MFI series (0-100 range)
-        """
-        # Typical Price
-        tp = (df['high'] + df['low'] + df['close']) / 3
-        
-        # Raw Money Flow
-        rmf = tp * df['vol']
-        
-        # Previous Typical Price
-        prev_tp = tp.groupby(df['ts_code']).shift(1)
-        
-        # Positive and Negative Money Flow
-        pos_flow = pd.Series(0.0, index=df.index)
-        neg_flow = pd.Series(0.0, index=df.index)
-        
-        pos_mask = tp > prev_tp
-        neg_mask = tp < prev_tp
-        
-        pos_flow[pos_mask] = rmf[pos_mask]
-        neg_flow[neg_mask] = rmf[neg_mask]
-        
-        # Rolling Sums
-        rolling_pos = pos_flow.groupby(df['ts_code']).rolling(period).sum().reset_index(0, drop=True)
-        rolling_neg = neg_flow.groupby(df['ts_code']).rolling(period).sum().reset_index(0, drop=True)
-        
-        # Money Flow Ratio
-        mfr = rolling_pos / rolling_neg.replace(0, np.nan)
-        
-        # MFI = 100 - (100 / (1 + MFR))
-        mfi = 100 - (100 / (1 + mfr))
-        
-        # Handle special cases
-        mask_zero_neg = (rolling_neg == 0)
-        mfi[mask_zero_neg] = 100
-        
-        return mfi
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from .mfi import compute_mfi
+from ._utils import group_index, rolling_sorted, shift_sorted
 
 class MFIDivergence(BaseFactor):
     """
@@ -60,14 +62,14 @@ class MFIDivergence(BaseFactor):
         
         Steps:
         1. Calculate basic MFI
-        2. Calculate rolling highest/lowest price
+        2. Calculate highest/lowest price of the previous N-1 days
         3. Calculate rolling highest/lowest MFI
         4. Detect bullish divergence:
-           - close == N-day lowest price AND
+           - close <= previous N-1 day lowest price (i.e. a new N-day low) AND
            - MFI > N-day lowest MFI AND
            - MFI < oversold_threshold
         5. Detect bearish divergence:
-           - close == N-day highest price AND
+           - close >= previous N-1 day highest price (i.e. a new N-day high) AND
            - MFI < N-day highest MFI AND
            - MFI > overbought_threshold
         
@@ -80,46 +82,50 @@ class MFIDivergence(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
+        
+        groups = group_index(df)
         
         # Step 1: Calculate basic MFI
-        mfi = self._calculate_mfi(df, self.mfi_period)
-        close = df['close']
+        mfi = compute_mfi(df, self.mfi_period)
+        close = df['close'].to_numpy(dtype=np.float64)
         
-        # Step 2: Calculate rolling highest/lowest price
-        price_high = close.groupby(df['ts_code']).rolling(self.lookback).max().reset_index(0, drop=True)
-        price_low = close.groupby(df['ts_code']).rolling(self.lookback).min().reset_index(0, drop=True)
+        # Step 2: Highest/lowest price over the previous lookback-1 days (current day excluded)
+        # close <= prev_low is the same as close == N-day low, without exact float equality
+        price_high = shift_sorted(rolling_sorted(close, groups, self.lookback - 1, how='max'), 1, groups)
+        price_low = shift_sorted(rolling_sorted(close, groups, self.lookback - 1, how='min'), 1, groups)
         
         # Step 3: Calculate rolling highest/lowest MFI
-        mfi_high = mfi.groupby(df['ts_code']).rolling(self.lookback).max().reset_index(0, drop=True)
-        mfi_low = mfi.groupby(df['ts_code']).rolling(self.lookback).min().reset_index(0, drop=True)
+        mfi_high = rolling_sorted(mfi, groups, self.lookback, how='max')
+        mfi_low = rolling_sorted(mfi, groups, self.lookback, how='min')
         
         # Step 4: Detect bullish divergence (buy signal)
-        # Condition 1: Price touches N-day low
+        # Condition 1: Price makes N-day low
         # Condition 2: MFI above N-day low (money not panicking)
         # Condition 3: MFI in oversold zone (< oversold_threshold)
         bullish_divergence = (
-            (close == price_low) &
+            (close <= price_low) &
             (mfi > mfi_low) &
             (mfi < self.oversold_threshold)
-        ).astype(float)
+        ).astype(np.int8)
         
         # Step 5: Detect bearish divergence (sell signal)
-        # Condition 1: Price touches N-day high
+        # Condition 1: Price makes N-day high
         # Condition 2: MFI below N-day high (money not chasing)
         # Condition 3: MFI in overbought zone (> overbought_threshold)
         bearish_divergence = (
-            (close == price_high) &
+            (close >= price_high) &
             (mfi < mfi_high) &
             (mfi > self.overbought_threshold)
-        ).astype(float)
+        ).astype(np.int8)
         
         # Factor assignment: bullish is positive, bearish is negative
+        # int8 is enough for a {-1, 0, +1} signal
         divergence_signal = bullish_divergence - bearish_divergence
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: divergence_signal,
+            self.name: pd.Series(divergence_signal, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -127,49 +133,3 @@ class MFIDivergence(BaseFactor):
         result = result.set_index(['trade_date', 'ts_code']).sort_index()
         
         return result
-    
-    def _calculate_mfi(self, df: pd.DataFrame, period: int) -> pd.Series:
-        """
-        Calculate basic MFI (Money Flow Index).
-        
-        Args:
-            df: Input dataframe
-            period: MFI calculation period
-            
-        Returns:
-            MFI series (0-100 range)
-        """
-        # Typical Price
-        tp = (df['high'] + df['low'] + df['close']) / 3
-        
-        # Raw Money Flow
-        rmf = tp * df['vol']
-        
-        # Previous Typical Price
-        prev_tp = tp.groupby(df['ts_code']).shift(1)
-        
-        # Positive and Negative Money Flow
-        pos_flow = pd.Series(0.0, index=df.index)
-        neg_flow = pd.Series(0.0, index=df.index)
-        
-        pos_mask = tp > prev_tp
-        neg_mask = tp < prev_tp
-        
-        pos_flow[pos_mask] = rmf[pos_mask]
-        neg_flow[neg_mask] = rmf[neg_mask]
-        
-        # Rolling Sums
-        rolling_pos = pos_flow.groupby(df['ts_code']).rolling(period).sum().reset_index(0, drop=True)
-        rolling_neg = neg_flow.groupby(df['ts_code']).rolling(period).sum().reset_index(0, drop=True)
-        
-        # Money Flow Ratio
-        mfr = rolling_pos / rolling_neg.replace(0, np.nan)
-        
-        # MFI = 100 - (100 / (1 + MFR))
-        mfi = 100 - (100 / (1 + mfr))
-        
-        # Handle special cases
-        mask_zero_neg = (rolling_neg == 0)
-        mfi[mask_zero_neg] = 100
-        
-        return mfi
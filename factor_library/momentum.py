@@ -2,6 +2,7 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import group_index, shift_sorted
 
 class Momentum(BaseFactor):
     """
@@ -36,7 +37,7 @@ class Momentum(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Define window sizes (approximate trading days)
         lag_1m = 21
@@ -44,10 +45,12 @@ class Momentum(BaseFactor):
         
         # Calculate R11
         # P_{t-lag_1m} / P_{t-lag_12m} - 1
-        # Group by ts_code to avoid cross-stock shifting
+        # Shift the sorted close array directly; lags that cross a ts_code boundary are NaN
+        close = df['close'].to_numpy()
+        groups = group_index(df)
         
-        p_t_minus_1m = df.groupby('ts_code')['close'].shift(lag_1m)
-        p_t_minus_12m = df.groupby('ts_code')['close'].shift(lag_12m)
+        p_t_minus_1m = shift_sorted(close, lag_1m, groups)
+        p_t_minus_12m = shift_sorted(close, lag_12m, groups)
         
         r11 = (p_t_minus_1m / p_t_minus_12m) - 1
         
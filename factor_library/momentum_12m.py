@@ -6,6 +6,7 @@ import sys
 # 添加因子库路径
 sys.path.append(str(Path.cwd().parent))
 from .base_factor import BaseFactor
+from ._utils import group_index
 
 
 class Momentum12M(BaseFactor):
@@ -54,7 +55,7 @@ class Momentum12M(BaseFactor):
         self.check_dependencies(df)
         
         # 确保数据按股票代码和交易日期排序
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # 定义时间窗口（近似交易日数）
         lag_1m = 21    # 1个月约21个交易日（排除最近一个月）
@@ -64,16 +65,20 @@ class Momentum12M(BaseFactor):
         # 计算 MOM12 = P_{t-21} / P_{t-273} - 1
         # 这样计算的是从 t-273天到t-21天之间的12个月累计收益率
         # 即：过去12个月（不包含最近1个月）的收益
-        # 按 ts_code 分组，避免跨股票计算
-        p_t_minus_1m = df.groupby('ts_code')['close'].shift(lag_1m)    # 1个月前的价格
-        p_t_minus_13m = df.groupby('ts_code')['close'].shift(lag_13m)  # 13个月前的价格
-        
-        # 计算累计收益率（12个月的收益）
-        mom12 = (p_t_minus_1m / p_t_minus_13m) - 1
+        # 在排序后的整列收盘价上做一次切片除法：
+        # mom12[k] = close[k-21] / close[k-273] - 1，组内位置不足273的行置为NaN，避免跨股票计算
+        close = df['close'].to_numpy(dtype=np.float64)
+        mom12 = np.full(len(close), np.nan)
+        if len(close) > lag_13m:
+            # 除法与减1都直接写入输出切片，不产生中间数组
+            out = mom12[lag_13m:]
+            np.divide(close[lag_12m:len(close) - lag_1m], close[:len(close) - lag_13m], out=out)
+            out -= 1
+            mom12[group_index(df).positions < lag_13m] = np.nan
         
         # 准备结果DataFrame
         result = pd.DataFrame({
-            self.name: mom12,
+            self.name: pd.Series(mom12, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
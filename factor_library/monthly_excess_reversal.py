@@ -8,6 +8,7 @@ factor_lib_path = Path(__file__).parent.parent if '__file__' in locals() else Pa
 sys.path.insert(0, str(factor_lib_path))
 
 from .base_factor import BaseFactor
+from ._utils import GroupIndex, ffill_sorted, group_index, rolling_sorted
 
 
 class MonthlyExcessReturnSeasonalReversal(BaseFactor):
@@ -56,7 +57,7 @@ class MonthlyExcessReturnSeasonalReversal(BaseFactor):
             raise ValueError("DataFrame必须包含'ts_code'和'trade_date'列")
         
         # 确保数据已排序
-        df = df.sort_values(['ts_code', 'trade_date']).copy()
+        df = self._ensure_sorted(df).copy()
         
         # 确保trade_date是datetime格式
         if df['trade_date'].dtype == 'object':
@@ -65,11 +66,13 @@ class MonthlyExcessReturnSeasonalReversal(BaseFactor):
             df['trade_date'] = pd.to_datetime(df['trade_date'].astype(str), format='%Y%m%d')
         
         # 添加年月字段
-        df['year_month'] = df['trade_date'].dt.to_period('M')
+        # 年月用整数月序号 year*12 + month 表示（而非 Period 对象），分组走 int64 哈希，"下个月"即 +1
         df['month'] = df['trade_date'].dt.month
+        df['year_month'] = df['trade_date'].dt.year * 12 + df['month']
         
         # 计算每只股票的月末收盘价（使用每月最后一个交易日）
-        monthly_close = df.groupby(['ts_code', 'year_month']).agg({
+        # df 已按 (ts_code, trade_date) 排序，分组按出现顺序即为有序，无需 sort=True 再排一次
+        monthly_close = df.groupby(['ts_code', 'year_month'], sort=False, observed=True).agg({
             'close': 'last',
             'trade_date': 'last',
             'month': 'last'
@@ -77,7 +80,7 @@ class MonthlyExcessReturnSeasonalReversal(BaseFactor):
         
         # 计算月度收益率
         monthly_close = monthly_close.sort_values(['ts_code', 'year_month'])
-        monthly_close['stock_monthly_return'] = monthly_close.groupby('ts_code')['close'].pct_change()
+        monthly_close['stock_monthly_return'] = monthly_close.groupby('ts_code', sort=False, observed=True)['close'].pct_change()
         
         # 计算市场月度收益率
         if market_df is not None:
@@ -88,8 +91,8 @@ class MonthlyExcessReturnSeasonalReversal(BaseFactor):
             elif market_df['trade_date'].dtype == 'int64':
                 market_df['trade_date'] = pd.to_datetime(market_df['trade_date'].astype(str), format='%Y%m%d')
             
-            market_df['year_month'] = market_df['trade_date'].dt.to_period('M')
-            market_monthly = market_df.groupby('year_month').agg({
+            market_df['year_month'] = market_df['trade_date'].dt.year * 12 + market_df['trade_date'].dt.month
+            market_monthly = market_df.groupby('year_month', sort=False).agg({
                 'close': 'last'
             }).reset_index()
             market_monthly = market_monthly.sort_values('year_month')
@@ -103,7 +106,7 @@ class MonthlyExcessReturnSeasonalReversal(BaseFactor):
             )
         else:
             # 如果没有市场数据，使用所有股票的等权平均收益率作为市场收益率
-            market_return = monthly_close.groupby('year_month')['stock_monthly_return'].mean().reset_index()
+            market_return = monthly_close.groupby('year_month', sort=False)['stock_monthly_return'].mean().reset_index()
             market_return.columns = ['year_month', 'market_monthly_return']
             monthly_close = monthly_close.merge(market_return, on='year_month', how='left')
         
@@ -112,71 +115,66 @@ class MonthlyExcessReturnSeasonalReversal(BaseFactor):
         
         # 计算季节性反转因子
         # 对于每个月末时间点t，计算过去1-11个月（排除去年同月）的超额收益均值
-        result_list = []
-        
-        for ts_code in monthly_close['ts_code'].unique():
-            stock_data = monthly_close[monthly_close['ts_code'] == ts_code].copy()
-            stock_data = stock_data.sort_values('year_month')
+        # 向量化实现：按当前月份m分12组处理。对每个m，取出所有月份!=m的行组成子序列，
+        # 在子序列上按股票做一次滚动窗口（最近lookback_months行）求和与计数，
+        # 再把每个月份==m的行映射到其之前最近的一个子序列行，取该行的窗口均值
+        groups = group_index(monthly_close)
+        excess = monthly_close['excess_return'].to_numpy(dtype=np.float64)
+        month = monthly_close['month'].to_numpy()
+        valid = ~np.isnan(excess)
+        excess_filled = np.where(valid, excess, 0.0)
+        
+        # 至少需要lookback_months个历史月份
+        has_history = groups.positions >= self.lookback_months
+        factor_values = np.full(len(monthly_close), np.nan)
+        
+        for m in np.unique(month):
+            target = month == m
+            keep = ~target
+            kept_codes = groups.codes[keep]
+            if len(kept_codes) == 0:
+                continue
+            kept_groups = GroupIndex(kept_codes)
             
-            factor_values = []
-            year_months = []
+            # 子序列上最近lookback_months行的超额收益之和与有效值个数
+            window_sum = rolling_sorted(excess_filled[keep], kept_groups, self.lookback_months, how='sum', min_periods=1)
+            window_count = rolling_sorted(valid[keep], kept_groups, self.lookback_months, how='sum', min_periods=1)
             
-            for idx, row in stock_data.iterrows():
-                current_month = row['month']
-                current_year_month = row['year_month']
-                
-                # 获取过去的数据（需要足够的历史数据）
-                past_data = stock_data[stock_data['year_month'] < current_year_month]
-                
-                if len(past_data) >= self.lookback_months:
-                    # 排除与当前月份相同的历史月份（季节性调整）
-                    past_data_filtered = past_data[past_data['month'] != current_month]
-                    
-                    # 取最近的lookback_months个月数据
-                    past_data_filtered = past_data_filtered.tail(self.lookback_months)
-                    
-                    # 计算超额收益均值
-                    if len(past_data_filtered) > 0:
-                        factor_value = past_data_filtered['excess_return'].mean()
-                    else:
-                        factor_value = np.nan
-                else:
-                    factor_value = np.nan
-                
-                factor_values.append(factor_value)
-                year_months.append(current_year_month)
+            # 每个目标行之前最近的子序列行（必须属于同一只股票）
+            rows = np.flatnonzero(target & has_history)
+            last_kept = np.cumsum(keep)[rows] - 1
+            same_stock = last_kept >= 0
+            same_stock[same_stock] = kept_codes[last_kept[same_stock]] == groups.codes[rows[same_stock]]
+            rows, last_kept = rows[same_stock], last_kept[same_stock]
             
-            temp_df = pd.DataFrame({
-                'ts_code': ts_code,
-                'year_month': year_months,
-                self.name: factor_values
-            })
-            result_list.append(temp_df)
-        
-        # 合并所有股票的结果
-        monthly_factors = pd.concat(result_list, ignore_index=True)
+            count = window_count[last_kept]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                factor_values[rows] = np.where(count > 0, window_sum[last_kept] / count, np.nan)
         
         # 将月度因子值扩展到每日数据
         # 关键：在t月月末计算的因子，应该在t+1月初开始使用（避免前视偏差）
-        df_with_month = df[['ts_code', 'trade_date', 'year_month']].copy()
-        
-        # 将因子值向后移一个月（月末计算的值用于下个月）
-        monthly_factors['year_month_shifted'] = monthly_factors['year_month'].apply(lambda x: x + 1)
-        
-        # 合并到日度数据
-        result = df_with_month.merge(
-            monthly_factors[['ts_code', 'year_month_shifted', self.name]],
-            left_on=['ts_code', 'year_month'],
-            right_on=['ts_code', 'year_month_shifted'],
-            how='left'
+        # 日度数据与月度数据都按 (ts_code, 年月) 排序，每个 (股票, 月) 块恰好对应 monthly_close 的一行，
+        # 因此用块序号直接定位：日度行取其所在块的前一块的因子值，前提是前一块属于同一只股票且正好是上个月
+        daily_groups = group_index(df)
+        codes = daily_groups.codes
+        month_key = df['year_month'].to_numpy()
+        new_block = np.r_[True, (codes[1:] != codes[:-1]) | (month_key[1:] != month_key[:-1])]
+        block = np.cumsum(new_block) - 1
+        prev_block = block - 1
+        has_prev = prev_block >= 0
+        has_prev[has_prev] = (
+            (codes[new_block][prev_block[has_prev]] == codes[has_prev]) &
+            (month_key[new_block][prev_block[has_prev]] == month_key[has_prev] - 1)
         )
-        
-        # 清理辅助列
-        result = result[['ts_code', 'trade_date', self.name]]
+        daily_values = np.full(len(df), np.nan)
+        daily_values[has_prev] = factor_values[prev_block[has_prev]]
         
         # 对于每只股票，前向填充因子值（月内所有交易日使用同一因子值）
-        result = result.sort_values(['ts_code', 'trade_date'])
-        result[self.name] = result.groupby('ts_code')[self.name].ffill()
+        result = pd.DataFrame({
+            'ts_code': df['ts_code'],
+            'trade_date': df['trade_date'],
+            self.name: ffill_sorted(daily_values, daily_groups)
+        })
         
         # 设置索引
         result = result.set_index(['trade_date', 'ts_code']).sort_index()
@@ -2,7 +2,7 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
-from scripts.utils.financial_utils import convert_ytd_to_ttm
+from ._utils import group_index
 
 class NOAT(BaseFactor):
     """
@@ -24,8 +24,12 @@ class NOAT(BaseFactor):
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         self.check_dependencies(df)
         
+        # Rows of a stock must be contiguous; a stable sort keeps their report order
+        if not df['ts_code'].is_monotonic_increasing:
+            df = df.sort_values('ts_code', kind='stable')
+        
         # Calculate TTM for Revenue (Flow variable)
-        df = convert_ytd_to_ttm(df, 'revenue')
+        # Already converted to TTM in construct_fundamental_factors.py
         
         # Net Operating Assets
         # NOA = Operating Assets - Operating Liabilities
@@ -38,30 +42,35 @@ class NOAT(BaseFactor):
         # If we have 'interestdebt', we can estimate Operating Liab = Total Liab - Interest Debt.
         # But we need Total Liab. Total Liab = Total Assets - Equity.
         
-        total_liab = df['total_assets'] - df.get('total_hldr_eqy_inc_min_int', 0)
+        # Bind every input once as a float array; an optional field that is missing counts as 0
+        def field(col):
+            return df[col].to_numpy(dtype=np.float64) if col in df.columns else 0.0
+        
+        total_assets = field('total_assets')
+        total_liab = total_assets - field('total_hldr_eqy_inc_min_int')
         
         # If interestdebt is available, use it. Else assume 0 or some proxy.
-        debt = df.get('interestdebt', 0)
+        debt = field('interestdebt')
         
         # Operating Liab = Total Liab - Debt
         op_liab = total_liab - debt
         
         # Operating Assets = Total Assets - Cash
-        cash = df.get('money_cap', 0)
-        op_assets = df['total_assets'] - cash
+        cash = field('money_cap')
+        op_assets = total_assets - cash
         
         noa = op_assets - op_liab
         
-        # Ensure numeric
-        noa = pd.to_numeric(noa, errors='coerce')
-        
-        # Average NOA
-        # We can assign noa to df temporarily
-        # Assuming df is sorted by ts_code, end_date
-        df['_noa'] = noa
-        avg_noa = df.groupby('ts_code')['_noa'].rolling(4).mean().reset_index(level=0, drop=True)
+        # Average NOA over the last 4 reports of each stock
+        # Four shifted slices of the ts_code-contiguous NOA array added in one expression;
+        # rows with fewer than 4 reports in their stock are masked to NaN
+        avg_noa = np.full(len(noa), np.nan)
+        if len(noa) >= 4:
+            avg_noa[3:] = (noa[:-3] + noa[1:-2] + noa[2:-1] + noa[3:]) / 4
+            avg_noa[group_index(df).positions < 3] = np.nan
+        avg_noa = pd.Series(avg_noa, index=df.index)
         
-        factor_value = df['revenue_ttm'] / avg_noa
+        factor_value = df['revenue'] / avg_noa
         factor_value = factor_value.replace([np.inf, -np.inf], np.nan)
         
         result = pd.DataFrame({
@@ -2,6 +2,39 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import cached_on_frame, cumsum_sorted, group_index, shift_sorted
+
+def _obv(df: pd.DataFrame) -> np.ndarray:
+    # If Close > PrevClose, Vol is positive.
+    # If Close < PrevClose, Vol is negative.
+    # If Close == PrevClose (or either is missing), Vol is 0.
+    groups = group_index(df)
+    close = df['close'].to_numpy(dtype=np.float64)
+    prev_close = shift_sorted(close, 1, groups)
+    vol_direction = np.nan_to_num(np.sign(close - prev_close))
+    
+    signed_vol = vol_direction * df['vol'].to_numpy(dtype=np.float64)
+    
+    # Cumulative Sum (one sequential pass per stock slice)
+    return cumsum_sorted(signed_vol, groups)
+
+
+def compute_obv(df: pd.DataFrame) -> np.ndarray:
+    """
+    Calculate OBV (On Balance Volume): cumulative volume signed by the price change.
+    
+    Shared by OnBalanceVolume and the OBV* factors. The result is cached per
+    input frame, so a pipeline that passes the same panel to every OBV factor
+    builds OBV only once.
+    
+    Args:
+        df: Daily dataframe with 'close', 'vol', sorted by ['ts_code', 'trade_date'].
+        
+    Returns:
+        Read-only OBV array in row order of df.
+    """
+    return cached_on_frame(df, 'obv', ['ts_code', 'close', 'vol'], _obv)
+
 
 class OnBalanceVolume(BaseFactor):
     """
@@ -31,23 +64,10 @@ class OnBalanceVolume(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Calculate OBV
-        # If Close > PrevClose, Vol is positive.
-        # If Close < PrevClose, Vol is negative.
-        # If Close == PrevClose, Vol is 0.
-        
-        prev_close = df.groupby('ts_code')['close'].shift(1)
-        
-        vol_direction = pd.Series(0, index=df.index)
-        vol_direction[df['close'] > prev_close] = 1
-        vol_direction[df['close'] < prev_close] = -1
-        
-        signed_vol = vol_direction * df['vol']
-        
-        # Cumulative Sum
-        obv = signed_vol.groupby(df['ts_code']).cumsum()
+        obv = compute_obv(df)
         
         # Refinement: 10-day slope or pct_change
         # Since OBV can be negative or zero, pct_change might be unstable.
@@ -64,11 +84,11 @@ class OnBalanceVolume(BaseFactor):
         # Let's stick to simple 10-day change or slope.
         # Let's implement 10-day change.
         
-        obv_change = obv.groupby(df['ts_code']).diff(10)
+        obv_change = obv - shift_sorted(obv, 10, group_index(df))
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: obv_change,
+            self.name: pd.Series(obv_change, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from .obv import compute_obv
+from ._utils import group_index, rolling_sorted, shift_sorted
 
 class OBVBreakthrough(BaseFactor):
     """
@@ -31,37 +33,34 @@ class OBVBreakthrough(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Calculate OBV first
-        prev_close = df.groupby('ts_code')['close'].shift(1)
-        
-        vol_direction = pd.Series(0, index=df.index)
-        vol_direction[df['close'] > prev_close] = 1
-        vol_direction[df['close'] < prev_close] = -1
-        
-        signed_vol = vol_direction * df['vol']
-        obv = signed_vol.groupby(df['ts_code']).cumsum()
+        obv = compute_obv(df)
+        groups = group_index(df)
         
         # Calculate historical high OBV
-        obv_high = obv.groupby(df['ts_code']).rolling(rank_period).max().reset_index(level=0, drop=True)
+        # One flat rolling max (monotonic deque) over the sorted OBV column, windows crossing stocks masked
+        obv_high = rolling_sorted(obv, groups, rank_period, how='max')
         
         # Previous day's historical high
-        obv_high_shifted = obv_high.groupby(df['ts_code']).shift(1)
+        obv_high_shifted = shift_sorted(obv_high, 1, groups)
         
         # Safe breakthrough strength calculation
-        obv_breakthrough = np.where(
-            obv_high_shifted.abs() > 1e-10,
-            (obv - obv_high_shifted) / obv_high_shifted.abs(),
-            0
-        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            obv_breakthrough = np.where(
+                np.abs(obv_high_shifted) > 1e-10,
+                (obv - obv_high_shifted) / np.abs(obv_high_shifted),
+                0
+            )
         
-        # Clip to [-5, 5] range (±500%)
-        obv_breakthrough = pd.Series(obv_breakthrough, index=obv.index).clip(-5, 5)
+        # Clip to [-5, 5] range (±500%); a bounded ratio needs no more than float32
+        np.clip(obv_breakthrough, -5, 5, out=obv_breakthrough)
+        obv_breakthrough = obv_breakthrough.astype(np.float32)
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: obv_breakthrough,
+            self.name: pd.Series(obv_breakthrough, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from .obv import compute_obv
+from ._utils import group_index, shift_sorted
 
 class OBVChangeRate(BaseFactor):
     """
@@ -30,34 +32,29 @@ class OBVChangeRate(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Calculate OBV first
-        prev_close = df.groupby('ts_code')['close'].shift(1)
-        
-        vol_direction = pd.Series(0, index=df.index)
-        vol_direction[df['close'] > prev_close] = 1
-        vol_direction[df['close'] < prev_close] = -1
-        
-        signed_vol = vol_direction * df['vol']
-        obv = signed_vol.groupby(df['ts_code']).cumsum()
+        obv = compute_obv(df)
         
         # Calculate OBV value from trend_period days ago
-        obv_shifted = obv.groupby(df['ts_code']).shift(trend_period)
+        obv_shifted = shift_sorted(obv, trend_period, group_index(df))
         
         # Safe percentage change calculation to avoid division by zero
-        obv_change = np.where(
-            obv_shifted.abs() > 1e-10,
-            (obv - obv_shifted) / obv_shifted.abs(),
-            0
-        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            obv_change = np.where(
+                np.abs(obv_shifted) > 1e-10,
+                (obv - obv_shifted) / np.abs(obv_shifted),
+                0
+            )
         
-        # Clip to [-10, 10] range (±1000%)
-        obv_change = pd.Series(obv_change, index=obv.index).clip(-10, 10)
+        # Clip to [-10, 10] range (±1000%); a bounded ratio needs no more than float32
+        np.clip(obv_change, -10, 10, out=obv_change)
+        obv_change = obv_change.astype(np.float32)
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: obv_change,
+            self.name: pd.Series(obv_change, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from .obv import compute_obv
+from ._utils import group_index, rolling_slope_sorted
 
 class OBVDivergence(BaseFactor):
     """
@@ -31,57 +33,40 @@ class OBVDivergence(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
-        # Calculate OBV first
-        prev_close = df.groupby('ts_code')['close'].shift(1)
-        
-        vol_direction = pd.Series(0, index=df.index)
-        vol_direction[df['close'] > prev_close] = 1
-        vol_direction[df['close'] < prev_close] = -1
-        
-        signed_vol = vol_direction * df['vol']
-        obv = signed_vol.groupby(df['ts_code']).cumsum()
-        
-        # Calculate slope function
-        def calc_slope(series):
-            """Calculate linear regression slope"""
-            if len(series) < divergence_period or series.isna().any():
-                return np.nan
-            x = np.arange(len(series))
-            y = series.values
-            try:
-                slope = np.polyfit(x, y, 1)[0]
-                return slope
-            except:
-                return np.nan
+        # Closed-form OLS slope over each full window (two rolling sums instead of a polyfit per window)
+        groups = group_index(df)
         
         # Calculate price trend slope
-        price_slope = df.groupby('ts_code')['close'].rolling(divergence_period).apply(calc_slope, raw=False).reset_index(level=0, drop=True)
+        price_slope = rolling_slope_sorted(df['close'].to_numpy(), groups, divergence_period)
         
         # Calculate OBV trend slope
-        obv_slope = obv.groupby(df['ts_code']).rolling(divergence_period).apply(calc_slope, raw=False).reset_index(level=0, drop=True)
+        obv_slope = rolling_slope_sorted(compute_obv(df), groups, divergence_period)
         
         # Safe normalization function
-        def safe_normalize(series, group_key):
-            """Safe normalization to avoid division by zero"""
-            def normalize_group(group):
-                mean = group.mean()
-                std = group.std()
-                if pd.isna(mean) or pd.isna(std) or std < 1e-8:
-                    return pd.Series(0, index=group.index)
-                return (group - mean) / std
-            
-            return series.groupby(group_key).transform(normalize_group)
+        def safe_normalize(values):
+            """Safe per-stock z-score; stocks with no spread (or no data) get 0"""
+            sizes = groups.ends - groups.starts
+            valid = ~np.isnan(values)
+            count = np.add.reduceat(valid.astype(np.float64), groups.starts)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.add.reduceat(np.where(valid, values, 0.0), groups.starts) / count
+                dev = np.where(valid, values - np.repeat(mean, sizes), 0.0)
+                std = np.sqrt(np.add.reduceat(dev * dev, groups.starts) / (count - 1))
+            ok = (count > 1) & (std >= 1e-8)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                normalized = (values - np.repeat(mean, sizes)) / np.repeat(std, sizes)
+            return np.where(np.repeat(ok, sizes), normalized, 0.0)
         
         # Normalize and calculate divergence
-        price_slope_norm = safe_normalize(price_slope, df['ts_code'])
-        obv_slope_norm = safe_normalize(obv_slope, df['ts_code'])
+        price_slope_norm = safe_normalize(price_slope)
+        obv_slope_norm = safe_normalize(obv_slope)
         obv_divergence = obv_slope_norm - price_slope_norm
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: obv_divergence,
+            self.name: pd.Series(obv_divergence, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from .obv import compute_obv
+from ._utils import group_index, rolling_sorted
 
 class OBVRank(BaseFactor):
     """
@@ -30,29 +32,21 @@ class OBVRank(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Calculate OBV first
-        prev_close = df.groupby('ts_code')['close'].shift(1)
+        obv = compute_obv(df)
         
-        vol_direction = pd.Series(0, index=df.index)
-        vol_direction[df['close'] > prev_close] = 1
-        vol_direction[df['close'] < prev_close] = -1
+        # Calculate percentile rank of the current OBV within each full window
+        # (pandas' native rolling rank, same as Series.rank(pct=True) of the window's last value)
+        obv_rank = rolling_sorted(obv, group_index(df), rank_period, how='rank', pct=True)
         
-        signed_vol = vol_direction * df['vol']
-        obv = signed_vol.groupby(df['ts_code']).cumsum()
-        
-        # Calculate percentile rank
-        def calc_rank(series):
-            if len(series) < rank_period:
-                return np.nan
-            return pd.Series(series).rank(pct=True).iloc[-1]
-        
-        obv_rank = obv.groupby(df['ts_code']).rolling(rank_period).apply(calc_rank, raw=False).reset_index(level=0, drop=True)
+        # A percentile in [0, 1] needs no more than float32
+        obv_rank = obv_rank.astype(np.float32)
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: obv_rank,
+            self.name: pd.Series(obv_rank, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
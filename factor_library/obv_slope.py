@@ -1,6 +1,7 @@
 import pandas as pd
-import numpy as np
 from .base_factor import BaseFactor
+from .obv import compute_obv
+from ._utils import group_index, rolling_slope_sorted
 
 class OBVSlope(BaseFactor):
     """
@@ -30,36 +31,18 @@ class OBVSlope(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Calculate OBV first
-        prev_close = df.groupby('ts_code')['close'].shift(1)
-        
-        vol_direction = pd.Series(0, index=df.index)
-        vol_direction[df['close'] > prev_close] = 1
-        vol_direction[df['close'] < prev_close] = -1
-        
-        signed_vol = vol_direction * df['vol']
-        obv = signed_vol.groupby(df['ts_code']).cumsum()
+        obv = compute_obv(df)
         
         # Calculate slope using linear regression
-        def calc_slope(series):
-            """Calculate linear regression slope"""
-            if len(series) < trend_period or series.isna().any():
-                return np.nan
-            x = np.arange(len(series))
-            y = series.values
-            try:
-                slope = np.polyfit(x, y, 1)[0]
-                return slope
-            except:
-                return np.nan
-        
-        obv_slope = obv.groupby(df['ts_code']).rolling(trend_period).apply(calc_slope, raw=False).reset_index(level=0, drop=True)
+        # Closed-form OLS slope over each full window (two rolling sums instead of a polyfit per window)
+        obv_slope = rolling_slope_sorted(obv, group_index(df), trend_period)
         
         # Prepare result
         result = pd.DataFrame({
-            self.name: obv_slope,
+            self.name: pd.Series(obv_slope, index=df.index),
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
@@ -27,10 +27,11 @@ class OCFtoNI(BaseFactor):
         # Calculate TTM for Cashflow and Net Income (Flow variables)
         # Already converted to TTM in construct_fundamental_factors.py
         
-        factor_value = df['n_cashflow_act'] / df['n_income']
+        ocf = df['n_cashflow_act'].to_numpy(dtype=np.float64, na_value=np.nan)
+        net_income = df['n_income'].to_numpy(dtype=np.float64, na_value=np.nan)
         
-        # Handle division by zero or infinites
-        factor_value = factor_value.replace([np.inf, -np.inf], np.nan)
+        # Zero net income gives NaN instead of an infinite ratio
+        factor_value = np.divide(ocf, net_income, out=np.full(len(ocf), np.nan), where=net_income != 0)
         
         result = pd.DataFrame({
             self.name: factor_value,
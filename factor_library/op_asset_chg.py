@@ -26,18 +26,16 @@ class OpAssetChg(BaseFactor):
         
         # Delta Operating Assets (Year over Year change)
         # Using shift(4) for YoY change in quarterly data
-        delta_op = op_assets - df.groupby('ts_code')['accounts_receiv'].shift(4).fillna(0) - df.groupby('ts_code')['inventories'].shift(4).fillna(0)
-        # Or simpler: op_assets - op_assets.shift(4)
-        # But we need to be careful with groupby
-        
-        op_assets_series = pd.Series(op_assets, index=df.index)
-        delta_op = op_assets_series - df.groupby('ts_code', group_keys=False).apply(lambda x: (x['accounts_receiv'].fillna(0) + x['inventories'].fillna(0)).shift(4))
+        # (shift and subtract fused in one groupby diff within each stock)
+        delta_op = op_assets.groupby(df['ts_code'], sort=False).diff(4)
         
         # Average Total Assets
         avg_assets = df.groupby('ts_code')['total_assets'].rolling(4).mean().reset_index(level=0, drop=True)
         
-        factor_value = delta_op / avg_assets
-        factor_value = factor_value.replace([np.inf, -np.inf], np.nan)
+        # Zero average assets gives NaN instead of an infinite ratio
+        delta_op = delta_op.to_numpy(dtype=np.float64, na_value=np.nan)
+        avg_assets = avg_assets.reindex(df.index).to_numpy(dtype=np.float64, na_value=np.nan)
+        factor_value = np.divide(delta_op, avg_assets, out=np.full(len(df), np.nan), where=avg_assets != 0)
         
         result = pd.DataFrame({
             self.name: factor_value,
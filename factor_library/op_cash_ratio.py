@@ -24,17 +24,15 @@ class OpCashRatio(BaseFactor):
         self.check_dependencies(df)
 
         # Calculate TTM Operating Cash Flow by summing the last four quarters' operating cash flow
-        ttm_op_cash_flow = df['op_income'].rolling(4).sum()
+        # (per stock, so that no window spans two companies)
+        ttm_op_cash_flow = df.groupby('ts_code', sort=False)['op_income'].rolling(4).sum().reset_index(level=0, drop=True)
 
         # Calculate TTM Revenue by summing the last four quarters' revenue
-        ttm_revenue = df['revenue'].rolling(4).sum()
+        ttm_revenue = df.groupby('ts_code', sort=False)['revenue'].rolling(4).sum().reset_index(level=0, drop=True)
 
         # Calculate the Operating Cash Flow to Revenue Ratio (TTM)
         factor_value = ttm_op_cash_flow / ttm_revenue
 
-        # Ensure numeric and handle potential errors
-        factor_value = pd.to_numeric(factor_value, errors='coerce')
-
         result = pd.DataFrame({
             self.name: factor_value,
             'ts_code': df['ts_code'],
@@ -25,17 +25,17 @@ class PegDyRatio(BaseFactor):
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         self.check_dependencies(df)
 
-        # Calculate PEG
-        peg = df['pe_ttm'] / df['eps_yoy']
+        pe_ttm = df['pe_ttm'].to_numpy(dtype=np.float64, na_value=np.nan)
+        eps_yoy = df['eps_yoy'].to_numpy(dtype=np.float64, na_value=np.nan)
+        cash_div = df['cash_div'].to_numpy(dtype=np.float64, na_value=np.nan)
+        close = df['close'].to_numpy(dtype=np.float64, na_value=np.nan)
 
-        # Calculate Dividend Yield
-        dividend_yield = df['cash_div'] / df['close']
+        # A zero growth rate, dividend or price leaves the ratio undefined (NaN)
+        valid = (eps_yoy != 0) & (cash_div != 0) & (close != 0)
 
-        # Calculate PEG-DY Ratio
-        peg_dy = peg / dividend_yield
-
-        # Ensure numeric
-        peg_dy = pd.to_numeric(peg_dy, errors='coerce')
+        # PEG / DY = (pe_ttm / eps_yoy) / (cash_div / close) = pe_ttm * close / (eps_yoy * cash_div),
+        # computed as a single division
+        peg_dy = np.divide(pe_ttm * close, eps_yoy * cash_div, out=np.full(len(df), np.nan), where=valid)
 
         result = pd.DataFrame({
             self.name: peg_dy,
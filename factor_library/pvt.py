@@ -2,6 +2,37 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import cached_on_frame, cumsum_sorted, group_index, shift_sorted
+
+def _pvt(df: pd.DataFrame) -> np.ndarray:
+    # PVT starts at 0 on the first day of every stock and adds
+    # vol * (close - prev_close) / prev_close each day; a zero previous close adds
+    # nothing, while a missing value carries through to the end of the stock.
+    groups = group_index(df)
+    close = df['close'].to_numpy(dtype=np.float64)
+    prev_close = shift_sorted(close, 1, groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pvt_inc = np.where(prev_close != 0, df['vol'].to_numpy(dtype=np.float64) * ((close - prev_close) / prev_close), 0.0)
+    pvt_inc[groups.starts] = 0.0
+    return cumsum_sorted(pvt_inc, groups, skipna=False)
+
+
+def compute_pvt(df: pd.DataFrame) -> np.ndarray:
+    """
+    Calculate the running PVT used by the PVT signal factors.
+    
+    Shared by PVTDivergence, PVTMADeviation and PVTMomentumReversal. Built in
+    one pass over the whole panel and cached per input frame, so a pipeline
+    that passes the same panel to all three builds PVT only once.
+    
+    Args:
+        df: Daily dataframe with 'close', 'vol', sorted by ['ts_code', 'trade_date'].
+        
+    Returns:
+        Read-only PVT array in row order of df.
+    """
+    return cached_on_frame(df, 'pvt', ['ts_code', 'close', 'vol'], _pvt)
+
 
 class PriceVolumeTrend(BaseFactor):
     """
@@ -31,23 +62,29 @@ class PriceVolumeTrend(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        # Calculate PVT
-        prev_close = df.groupby('ts_code')['close'].shift(1)
+        # Calculate PVT (group-aware shift and running sum over the sorted panel)
+        groups = group_index(df)
+        close = df['close'].to_numpy(dtype=np.float64)
+        prev_close = shift_sorted(close, 1, groups)
         
         # Percentage change
-        pct_change = (df['close'] - prev_close) / prev_close
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_change = (close - prev_close) / prev_close
         
         # PVT increment
-        pvt_inc = pct_change * df['vol']
+        pvt_inc = pct_change * df['vol'].to_numpy(dtype=np.float64)
         
-        # Cumulative Sum
-        pvt = pvt_inc.groupby(df['ts_code']).cumsum()
+        # Cumulative Sum; after an infinite increment (zero previous close) the
+        # rest of the stock is undefined, as with pandas' compensated groupby cumsum
+        pvt = cumsum_sorted(pvt_inc, groups)
+        infinite_inc = np.isinf(pvt_inc)
+        pvt[cumsum_sorted(infinite_inc, groups) - infinite_inc > 0] = np.nan
         
         # Refinement: 10-day change
-        pvt_change = pvt.groupby(df['ts_code']).diff(10)
+        pvt_change = pvt - shift_sorted(pvt, 10, groups)
         
         # Prepare result
         result = pd.DataFrame({
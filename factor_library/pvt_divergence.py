@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import group_index, rolling_sorted, shift_sorted
+from .pvt import compute_pvt
 
 class PVTDivergence(BaseFactor):
     """
@@ -40,57 +42,30 @@ class PVTDivergence(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def calculate_for_stock(group):
-            close_arr = group['close'].values
-            high_arr = group['high'].values
-            low_arr = group['low'].values
-            vol_arr = group['vol'].values
-            
-            n = len(close_arr)
-            
-            # Calculate PVT
-            pvt = np.zeros(n)
-            for i in range(1, n):
-                if close_arr[i-1] != 0:
-                    price_change_rate = (close_arr[i] - close_arr[i-1]) / close_arr[i-1]
-                    pvt[i] = pvt[i-1] + vol_arr[i] * price_change_rate
-                else:
-                    pvt[i] = pvt[i-1]
-            
-            # Calculate divergence
-            factor = np.zeros(n)
-            for i in range(self.divergence_window, n):
-                window_slice = slice(i - self.divergence_window, i)
-                
-                price_high_max = np.max(high_arr[window_slice])
-                price_low_min = np.min(low_arr[window_slice])
-                pvt_high_max = np.max(pvt[window_slice])
-                pvt_low_min = np.min(pvt[window_slice])
-                
-                is_price_new_high = high_arr[i] >= price_high_max
-                is_price_new_low = low_arr[i] <= price_low_min
-                is_pvt_new_high = pvt[i] >= pvt_high_max
-                is_pvt_new_low = pvt[i] <= pvt_low_min
-                
-                if is_price_new_high and not is_pvt_new_high:
-                    factor[i] = 1.0  # Bearish divergence
-                elif is_price_new_low and not is_pvt_new_low:
-                    factor[i] = -1.0  # Bullish divergence
-                else:
-                    factor[i] = 0.0
-            
-            # 5-day MA smoothing
-            smoothed_factor = np.zeros(n)
-            for i in range(4, n):
-                smoothed_factor[i] = np.mean(factor[i-4:i+1])
-            
-            return pd.Series(smoothed_factor, index=group.index)
+        # PVT for the whole panel in one pass
+        pvt = compute_pvt(df)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        
+        # Extremes of the previous divergence_window days (today excluded)
+        groups = group_index(df)
+        window = self.divergence_window
+        price_high_max = shift_sorted(rolling_sorted(high, groups, window, 'max'), 1, groups)
+        price_low_min = shift_sorted(rolling_sorted(low, groups, window, 'min'), 1, groups)
+        pvt_high_max = shift_sorted(rolling_sorted(pvt, groups, window, 'max'), 1, groups)
+        pvt_low_min = shift_sorted(rolling_sorted(pvt, groups, window, 'min'), 1, groups)
+        
+        # Calculate divergence (comparisons against an incomplete window are False)
+        is_bearish = (high >= price_high_max) & ~(pvt >= pvt_high_max)
+        is_bullish = (low <= price_low_min) & ~(pvt <= pvt_low_min)
+        factor = np.where(is_bearish, 1.0, np.where(is_bullish, -1.0, 0.0))
         
-        # Calculate for each stock
-        factor_values = df.groupby('ts_code', group_keys=False).apply(calculate_for_stock)
+        # 5-day MA smoothing (0 until a stock has 5 days); a signal in [-1, 1] needs no more than float32
+        factor_values = rolling_sorted(factor, groups, 5, 'mean')
+        factor_values = np.nan_to_num(factor_values, nan=0.0).astype(np.float32)
         
         # Prepare result
         result = pd.DataFrame({
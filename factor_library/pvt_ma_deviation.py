@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import group_index, rolling_sorted, shift_sorted
+from .pvt import compute_pvt
 
 class PVTMADeviation(BaseFactor):
     """
@@ -41,42 +43,23 @@ class PVTMADeviation(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def calculate_for_stock(group):
-            close_arr = group['close'].values
-            vol_arr = group['vol'].values
-            
-            n = len(close_arr)
-            
-            # Calculate PVT
-            pvt = np.zeros(n)
-            for i in range(1, n):
-                if close_arr[i-1] != 0:
-                    price_change_rate = (close_arr[i] - close_arr[i-1]) / close_arr[i-1]
-                    pvt[i] = pvt[i-1] + vol_arr[i] * price_change_rate
-                else:
-                    pvt[i] = pvt[i-1]
-            
-            # Calculate standardized deviation
-            factor = np.zeros(n)
-            for i in range(self.ma_window, n):
-                window_data = pvt[i - self.ma_window:i]
-                
-                pvt_ma = np.mean(window_data)
-                pvt_std = np.std(window_data)
-                
-                if pvt_std > 1e-8:
-                    deviation = (pvt[i] - pvt_ma) / pvt_std
-                    factor[i] = -deviation  # Reverse signal
-                else:
-                    factor[i] = 0.0
-            
-            return pd.Series(factor, index=group.index)
+        # PVT for the whole panel in one pass
+        pvt = compute_pvt(df)
+        
+        # MA and population std of the previous ma_window days (today excluded)
+        groups = group_index(df)
+        pvt_ma = shift_sorted(rolling_sorted(pvt, groups, self.ma_window, 'mean'), 1, groups)
+        pvt_std = shift_sorted(rolling_sorted(pvt, groups, self.ma_window, 'std', ddof=0), 1, groups)
+        
+        # Calculate standardized deviation (reverse signal); 0 on a flat or incomplete window
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor_values = np.where(pvt_std > 1e-8, -(pvt - pvt_ma) / pvt_std, 0.0)
         
-        # Calculate for each stock
-        factor_values = df.groupby('ts_code', group_keys=False).apply(calculate_for_stock)
+        # PVT and its rolling moments stay float64; the z-score needs no more than float32
+        factor_values = factor_values.astype(np.float32)
         
         # Prepare result
         result = pd.DataFrame({
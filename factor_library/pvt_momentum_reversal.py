@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import group_index, shift_sorted
+from .pvt import compute_pvt
 
 class PVTMomentumReversal(BaseFactor):
     """
@@ -40,37 +42,22 @@ class PVTMomentumReversal(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def calculate_for_stock(group):
-            close_arr = group['close'].values
-            vol_arr = group['vol'].values
-            
-            n = len(close_arr)
-            
-            # Calculate PVT
-            pvt = np.zeros(n)
-            for i in range(1, n):
-                if close_arr[i-1] != 0:
-                    price_change_rate = (close_arr[i] - close_arr[i-1]) / close_arr[i-1]
-                    pvt[i] = pvt[i-1] + vol_arr[i] * price_change_rate
-                else:
-                    pvt[i] = pvt[i-1]
-            
-            # Calculate momentum and reverse
-            factor = np.zeros(n)
-            for i in range(self.momentum_period, n):
-                if pvt[i - self.momentum_period] != 0:
-                    pvt_momentum = (pvt[i] - pvt[i - self.momentum_period]) / abs(pvt[i - self.momentum_period])
-                    factor[i] = -pvt_momentum  # Reverse signal
-                else:
-                    factor[i] = 0.0
-            
-            return pd.Series(factor, index=group.index)
+        # PVT for the whole panel in one pass
+        pvt = compute_pvt(df)
+        
+        # PVT momentum_period days earlier within each stock
+        groups = group_index(df)
+        pvt_lag = shift_sorted(pvt, self.momentum_period, groups)
         
-        # Calculate for each stock
-        factor_values = df.groupby('ts_code', group_keys=False).apply(calculate_for_stock)
+        # Calculate momentum and reverse, written straight into the output;
+        # 0 before a stock has momentum_period days or when the lagged PVT is 0.
+        # PVT itself stays float64, the relative change needs no more than float32
+        factor_values = np.zeros(len(df), dtype=np.float32)
+        has_lag = (groups.positions >= self.momentum_period) & (pvt_lag != 0)
+        np.divide(pvt_lag - pvt, np.abs(pvt_lag), out=factor_values, where=has_lag)
         
         # Prepare result
         result = pd.DataFrame({
@@ -28,15 +28,14 @@ class QuarterlyAbnormalGm(BaseFactor):
         # Calculate Sales (CS) for growth adjustment
         cs = df['c_fr_sale_sg']
 
-        # Calculate the adjusted GP (GP_q-4 * CS_q / CS_q-4)
-        adjusted_gp = gp.shift(4) * (cs / cs.shift(4))
+        # Calculate the adjusted GP (GP_q-4 * CS_q / CS_q-4), lagging within each stock
+        gp_lag = gp.groupby(df['ts_code'], sort=False).shift(4)
+        cs_lag = cs.groupby(df['ts_code'], sort=False).shift(4)
+        adjusted_gp = gp_lag * (cs / cs_lag)
 
         # Calculate Quarterly Abnormal Gross Margin
         abnormal_gm = (gp - adjusted_gp) / df['total_assets']
 
-        # Ensure numeric
-        abnormal_gm = pd.to_numeric(abnormal_gm, errors='coerce')
-
         result = pd.DataFrame({
             self.name: abnormal_gm,
             'ts_code': df['ts_code'],
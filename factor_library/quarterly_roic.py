@@ -26,17 +26,19 @@ class QuarterlyRoic(BaseFactor):
         # Default Tax Rate: 25%
         tax_rate = 0.25
 
+        operate_profit = df['operate_profit'].to_numpy(dtype=np.float64, na_value=np.nan)
+        int_exp = df['int_exp'].to_numpy(dtype=np.float64, na_value=np.nan)
+        equity = df['total_hldr_eqy_inc_min_int'].to_numpy(dtype=np.float64, na_value=np.nan)
+        interest_debt = df['interestdebt'].to_numpy(dtype=np.float64, na_value=np.nan)
+
         # Calculate EBIT (Earnings Before Interest and Taxes)
-        ebit = df['operate_profit'] + df['int_exp']
+        ebit = operate_profit + int_exp
 
         # Calculate Invested Capital
-        invested_capital = df['total_hldr_eqy_inc_min_int'] + df['interestdebt']
-
-        # Calculate ROIC
-        roic = (ebit * (1 - tax_rate)) / invested_capital
+        invested_capital = equity + interest_debt
 
-        # Ensure numeric
-        roic = pd.to_numeric(roic, errors='coerce')
+        # Calculate ROIC (NaN instead of an infinite value on zero invested capital)
+        roic = np.divide(ebit * (1 - tax_rate), invested_capital, out=np.full(len(ebit), np.nan), where=invested_capital != 0)
 
         result = pd.DataFrame({
             self.name: roic,
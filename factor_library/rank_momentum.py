@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from factor_library.base_factor import BaseFactor
+from factor_library._utils import GroupIndex, rolling_sorted, shift_sorted, ts_code_codes
 
 class RankMomentum(BaseFactor):
     """
@@ -60,29 +61,22 @@ class RankMomentum(BaseFactor):
         
         # 步骤2: 计算每日排名并标准化
         # rank_{i,d} = (y(R_{i,d}) - (N_d+1)/2) / sqrt((N_d+1)(N_d-1)/12)
-        def standardize_rank(group):
-            """对每日的收益率进行排名并标准化"""
-            # 排名（升序，从1开始）
-            ranks = group.rank(method='average')
-            N_d = group.count()  # 有效股票数量
-            
-            # 标准化
-            if N_d > 1:
-                mean_rank = (N_d + 1) / 2
-                std_rank = np.sqrt((N_d + 1) * (N_d - 1) / 12)
-                standardized = (ranks - mean_rank) / std_rank
-            else:
-                standardized = pd.Series(0, index=ranks.index)
-            
-            return standardized
+        # 按日截面一次性排名（升序，从1开始），N_d 为当日有效股票数量
+        by_date = df.groupby('trade_date', sort=False)['return']
+        ranks = by_date.rank(method='average').to_numpy()
+        N_d = by_date.transform('count').to_numpy()
         
-        df['rank_std'] = df.groupby('trade_date')['return'].transform(standardize_rank)
+        # 标准化（有效股票不足2只的交易日记为0）
+        mean_rank = (N_d + 1) / 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std_rank = np.sqrt((N_d + 1) * (N_d - 1) / 12)
+            df['rank_std'] = np.where(N_d > 1, (ranks - mean_rank) / std_rank, 0.0)
         
         # 步骤3: 计算月度排名标准化得分均值
         # 添加年月列用于分组
         df['year_month'] = df['trade_date'].dt.to_period('M')
         
-        monthly_rank = df.groupby(['ts_code', 'year_month'])['rank_std'].mean().reset_index()
+        monthly_rank = df.groupby(['ts_code', 'year_month'], observed=True)['rank_std'].mean().reset_index()
         monthly_rank.rename(columns={'rank_std': 'monthly_rank_mean'}, inplace=True)
         
         # 步骤4: 计算过去N个月（偏移M个月）的月度排名得分均值的平均值
@@ -92,33 +86,22 @@ class RankMomentum(BaseFactor):
         # 修正后的计算逻辑：
         # 对于时刻t，取[t-N-M+1, ..., t-M]的均值
         # 即：先计算rolling mean，再shift M个月
-        def calculate_rank_momentum(group):
-            """
-            计算每个股票的排序动量因子
-            公式: RankMomentum_{i,t}(N,M) = (1/N) * sum_{m=t-N-M+1}^{t-M} rank_{i,m}
-            实现: 先rolling(N).mean()得到过去N个月均值，再shift(M)偏移到t-M时刻
-            """
-            rank_momentum = group['monthly_rank_mean'].rolling(
-                window=self.N, 
-                min_periods=self.N
-            ).mean().shift(self.M)
-            return rank_momentum
-        
-        monthly_rank['RankMomentum'] = monthly_rank.groupby('ts_code').apply(
-            calculate_rank_momentum
-        ).reset_index(level=0, drop=True)
+        # 公式: RankMomentum_{i,t}(N,M) = (1/N) * sum_{m=t-N-M+1}^{t-M} rank_{i,m}
+        # 每只股票是排序后的一段连续行，全表一次完成分组 rolling 与 shift
+        groups = GroupIndex(ts_code_codes(monthly_rank))
+        rolling_mean = rolling_sorted(monthly_rank['monthly_rank_mean'].to_numpy(dtype=np.float64), groups, self.N, 'mean')
+        monthly_rank['RankMomentum'] = shift_sorted(rolling_mean, self.M, groups)
         
         # 将月度因子值扩展到每日
-        # 合并回原始数据框
-        df = df.merge(
-            monthly_rank[['ts_code', 'year_month', 'RankMomentum']],
-            on=['ts_code', 'year_month'],
-            how='left'
-        )
+        # 按 (ts_code, year_month) 直接定位每个交易日所属的月度行，无需整表 merge
+        monthly_keys = pd.MultiIndex.from_frame(monthly_rank[['ts_code', 'year_month']])
+        daily_keys = pd.MultiIndex.from_arrays([df['ts_code'], df['year_month']])
+        pos = monthly_keys.get_indexer(daily_keys)
+        rank_momentum = np.where(pos >= 0, monthly_rank['RankMomentum'].to_numpy()[pos], np.nan)
         
         # 准备返回结果
         result = pd.DataFrame({
-            self.name: df['RankMomentum'],
+            self.name: rank_momentum,
             'trade_date': df['trade_date'],
             'ts_code': df['ts_code']
         })
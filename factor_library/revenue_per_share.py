@@ -25,20 +25,19 @@ class RevenuePerShare(BaseFactor):
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         self.check_dependencies(df)
 
-        # Shift total_share to get the previous period's shares (approximating initial shares)
-        initial_shares = df['total_share'].shift(1)
-
         # Ending shares is the current period's total_share
-        ending_shares = df['total_share']
+        ending_shares = df['total_share'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        # Shift total_share to get the previous period's shares (approximating initial shares)
+        # within each stock, so a stock's first period has no initial shares
+        initial_shares = df.groupby('ts_code', sort=False)['total_share'].shift(1).to_numpy(dtype=np.float64, na_value=np.nan)
 
         # Calculate the average shares
         average_shares = (initial_shares + ending_shares) / 2
 
-        # Calculate Revenue Per Share
-        factor_value = df['revenue'] / average_shares
-
-        # Ensure numeric and handle potential errors
-        factor_value = pd.to_numeric(factor_value, errors='coerce')
+        # Calculate Revenue Per Share (NaN instead of an infinite value on zero shares)
+        revenue = df['revenue'].to_numpy(dtype=np.float64, na_value=np.nan)
+        factor_value = np.divide(revenue, average_shares, out=np.full(len(revenue), np.nan), where=average_shares != 0)
 
         result = pd.DataFrame({
             self.name: factor_value,
@@ -23,15 +23,18 @@ class ROEMomNAGrowth(BaseFactor):
 
         # ROE MoM: Change in ROE (TTM) from last quarter
         roe_ttm = df['roe_ttm']
-        roe_mom = (roe_ttm - roe_ttm.shift(1)) / abs(roe_ttm.shift(1))
+        roe_prev = roe_ttm.shift(1)
+        roe_mom = (roe_ttm - roe_prev) / abs(roe_prev)
 
         # Net Asset YoY Growth: Change in net asset (equity) YoY
         bv = df['total_hldr_eqy_exc_min_int']
-        net_asset_yoy_growth = (bv - bv.shift(4)) / bv.shift(4)
+        bv_prev = bv.shift(4)
+        net_asset_yoy_growth = (bv - bv_prev) / bv_prev
 
         # ROE MoM minus Net Asset YoY Growth
-        factor_value = roe_mom - net_asset_yoy_growth
-        factor_value = factor_value.replace([np.inf, -np.inf], np.nan)
+        factor_value = (roe_mom - net_asset_yoy_growth).to_numpy()
+        # A zero base quarter gives +-inf: mask it to NaN in one pass over the array
+        factor_value = np.where(np.isfinite(factor_value), factor_value, np.nan)
 
         result = pd.DataFrame({
             self.name: factor_value,
@@ -27,9 +27,8 @@ class RoicQoqChange(BaseFactor):
         # Calculate the ROIC for the current quarter
         roic_current = (df['operate_profit'] / df['revenue']) * (df['revenue'] / df['invest_capital'])
 
-        # Lag ROIC (from 4 quarters ago)
-        roic_lag = (df['operate_profit'].shift(4) / df['revenue'].shift(4)) * (
-                    df['revenue'].shift(4) / df['invest_capital'].shift(4))
+        # Lag ROIC (from 4 quarters ago): the same row-wise ROIC, shifted once
+        roic_lag = roic_current.shift(4)
 
         # Calculate the Quarter-over-Quarter change in ROIC
         roic_qoq_change = roic_current - roic_lag
@@ -1,6 +1,33 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import cached_on_frame, date_code_frame, group_index, shift_sorted
+
+
+def _gain_loss(df: pd.DataFrame) -> np.ndarray:
+    # 价格变动按股票分离为涨幅与跌幅 (每只股票首行变动为 NaN,比较结果为 False,记为 0)
+    close = df['close'].to_numpy(dtype=np.float64)
+    price_change = close - shift_sorted(close, 1, group_index(df))
+    return np.column_stack([
+        np.where(price_change > 0, price_change, 0.0),
+        np.where(price_change < 0, -price_change, 0.0),
+    ])
+
+
+def compute_gain_loss(df: pd.DataFrame) -> np.ndarray:
+    """
+    计算 RSI 所需的逐日涨幅与跌幅,按输入 DataFrame 缓存
+    
+    与周期无关,同一面板上计算多个周期的 RSI (如 7/14/21 参数扫描) 时只计算一次。
+    
+    Args:
+        df: 包含 'close' 的日频数据,按 ['ts_code', 'trade_date'] 排序
+        
+    Returns:
+        只读数组,形状 (len(df), 2),两列依次为涨幅和跌幅
+    """
+    return cached_on_frame(df, 'gain_loss', ['ts_code', 'close'], _gain_loss)
+
 
 class RSI(BaseFactor):
     """
@@ -54,44 +81,36 @@ class RSI(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # 按股票代码和日期排序 (与 turnover.py 保持一致,不使用 .copy())
-        df = df.sort_values(['ts_code', 'trade_date'])
-        
-        # 计算价格变动
-        df['price_change'] = df.groupby('ts_code')['close'].diff()
+        # 按股票代码和日期排序 (面板已有序时跳过排序,不复制数据)
+        df = self._ensure_sorted(df)
         
-        # 分离涨幅和跌幅
-        df['gain'] = df['price_change'].apply(lambda x: x if x > 0 else 0)
-        df['loss'] = df['price_change'].apply(lambda x: -x if x < 0 else 0)
+        # 逐日涨幅和跌幅 (与周期无关,同一面板上按帧缓存,中间结果不写回 df)
+        gain_loss = compute_gain_loss(df)
         
         # 使用 Wilder's 平滑方法计算平均涨跌幅
         # 注意: 这里使用 ewm 的等价方式,alpha = 1/period 对应 Wilder's 平滑
         # adjust=False 确保使用递归形式: y_t = alpha * x_t + (1-alpha) * y_{t-1}
-        df['avg_gain'] = df.groupby('ts_code')['gain'].transform(
-            lambda x: x.ewm(alpha=1/self.period, min_periods=self.period, adjust=False).mean()
-        )
-        df['avg_loss'] = df.groupby('ts_code')['loss'].transform(
-            lambda x: x.ewm(alpha=1/self.period, min_periods=self.period, adjust=False).mean()
-        )
+        # 涨跌两列一次 groupby.ewm: 所有股票在同一次 Cython 递推中完成,不再逐组调用 lambda
+        # (数据已按 ts_code 排序,sort=False 时各组按出现顺序拼接,结果与 df 行序一致)
+        avg = pd.DataFrame(gain_loss, columns=['gain', 'loss'], index=df.index).groupby(
+            df['ts_code'], sort=False, observed=True
+        ).ewm(alpha=1/self.period, min_periods=self.period, adjust=False).mean()
+        avg_gain = avg['gain'].to_numpy()
+        avg_loss = avg['loss'].to_numpy()
         
         # 计算相对强度 RS = Average Gain / Average Loss
         # 处理除零情况: 当 avg_loss 为 0 时,RS 视为无穷大,RSI = 100
-        df['RS'] = np.where(df['avg_loss'] != 0, df['avg_gain'] / df['avg_loss'], np.inf)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.where(avg_loss != 0, avg_gain / avg_loss, np.inf)
         
         # 计算 RSI = 100 - (100 / (1 + RS))
         rsi = np.where(
-            np.isinf(df['RS']), 
+            np.isinf(rs), 
             100.0, 
-            100 - (100 / (1 + df['RS']))
+            100 - (100 / (1 + rs))
         )
         
-        # 构造结果 DataFrame (与 turnover.py 保持一致的格式)
-        result = pd.DataFrame({
-            self.name: rsi,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
-        
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        # 构造结果 DataFrame (索引为 ['trade_date', 'ts_code'],直接按日期排好序构造)
+        result = date_code_frame(df, {self.name: rsi})
         
         return result
\ No newline at end of file
@@ -2,6 +2,98 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import (cached_on_frame, date_code_frame, group_index, rolling_sorted,
+                     sliding_wma_sorted)
+
+# Weights of the symmetric 4-bar WMA used by the RVI numerator, denominator and signal line,
+# unnormalised: the /6 cancels in the RVI ratio and is applied once to the signal line
+_WMA_WEIGHTS = np.array([1.0, 2.0, 2.0, 1.0])
+
+# Columns the cached RVI and its signal line are built from
+_RVI_COLUMNS = ['ts_code', 'open', 'high', 'low', 'close']
+
+
+def _rvi(df: pd.DataFrame) -> np.ndarray:
+    # Vigor = (Close - Open) / (High - Low), RVI = WMA(Vigor, 4) / WMA(High - Low, 4)
+    # with weights (1, 2, 2, 1) / 6, NaN for the first 3 days of every stock.
+    # Each step is one expression over the whole panel, grouped only by the
+    # boundary mask of the WMA.
+    groups = group_index(df)
+    # float64 up front: integer-stored prices would otherwise make the vigor
+    # buffer integer and fail (or truncate) in the division
+    open_prices = df['open'].to_numpy(dtype=np.float64)
+    high_prices = df['high'].to_numpy(dtype=np.float64)
+    low_prices = df['low'].to_numpy(dtype=np.float64)
+    close_prices = df['close'].to_numpy(dtype=np.float64)
+    
+    # Vigor is built in place in one buffer: close - open, divided by the range
+    # where it is non-zero and 0 where it is zero
+    range_hl = high_prices - low_prices
+    vigor = close_prices - open_prices
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(vigor, range_hl, out=vigor, where=range_hl != 0)
+    vigor[range_hl == 0] = 0.0
+    
+    # The 1/6 normalisation of both WMAs cancels in the ratio, so the
+    # unnormalised sums are divided directly
+    numerator = sliding_wma_sorted(vigor, _WMA_WEIGHTS, groups)
+    denominator = sliding_wma_sorted(range_hl, _WMA_WEIGHTS, groups)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rvi = np.divide(
+            numerator,
+            denominator,
+            out=np.full_like(numerator, np.nan),
+            where=(denominator != 0) & (~np.isnan(denominator))
+        )
+    return rvi
+
+
+def compute_rvi(df: pd.DataFrame) -> np.ndarray:
+    """
+    Calculate the smoothed (1-2-2-1 WMA) RVI used by the RVI signal factors.
+    
+    Returned as is by RVIValue and shared by RVICross, RVIDiff, RVIStrength,
+    RVITrend and RVIVolume. Cached per input frame, so a pipeline that passes
+    the same panel to all of them builds RVI only once.
+    
+    Args:
+        df: Daily dataframe with 'open', 'high', 'low', 'close', sorted by ['ts_code', 'trade_date'].
+        
+    Returns:
+        Read-only RVI array in row order of df.
+    """
+    return cached_on_frame(df, 'rvi', _RVI_COLUMNS, _rvi)
+
+
+def compute_rvi_signal(df: pd.DataFrame, signal_period: int = 4) -> np.ndarray:
+    """
+    Calculate the signal line of compute_rvi(df), cached per frame and signal_period.
+    
+    The 1-2-2-1 WMA of RVI when signal_period == 4, a simple mean over
+    signal_period days otherwise; NaN wherever the window holds a NaN.
+    
+    Args:
+        df: Daily dataframe with 'open', 'high', 'low', 'close', sorted by ['ts_code', 'trade_date'].
+        signal_period: Signal line period.
+        
+    Returns:
+        Read-only signal array in row order of df.
+    """
+    def _signal(df: pd.DataFrame) -> np.ndarray:
+        groups = group_index(df)
+        rvi = compute_rvi(df)
+        if signal_period == 4:
+            # Same 1-2-2-1 WMA as RVI itself
+            signal = sliding_wma_sorted(rvi, _WMA_WEIGHTS, groups)
+            signal /= 6
+            return signal
+        # Simple mean over signal_period days as one running-sum rolling pass:
+        # the window's count of valid values leaves it NaN until it holds no NaN
+        return rolling_sorted(rvi, groups, signal_period, 'mean')
+    
+    return cached_on_frame(df, f'rvi_signal_{signal_period}', _RVI_COLUMNS, _signal)
+
 
 class RelativeVigorIndex(BaseFactor):
     """
@@ -30,28 +122,23 @@ class RelativeVigorIndex(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
         window = 10
         
-        numerator = df['close'] - df['open']
-        denominator = df['high'] - df['low']
-        
-        # Rolling sums (or means, ratio is same)
-        rolling_num = numerator.groupby(df['ts_code']).rolling(window).mean().reset_index(0, drop=True)
-        rolling_den = denominator.groupby(df['ts_code']).rolling(window).mean().reset_index(0, drop=True)
+        numerator = df['close'].to_numpy(dtype=np.float64) - df['open'].to_numpy(dtype=np.float64)
+        denominator = df['high'].to_numpy(dtype=np.float64) - df['low'].to_numpy(dtype=np.float64)
         
-        # RVI
-        rvi = rolling_num / rolling_den.replace(0, np.nan)
+        # Rolling sums (or means, ratio is same), one flat pass over the sorted panel
+        groups = group_index(df)
+        rolling_num = rolling_sorted(numerator, groups, window, 'mean')
+        rolling_den = rolling_sorted(denominator, groups, window, 'mean')
         
-        # Prepare result
-        result = pd.DataFrame({
-            self.name: rvi,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
+        # RVI (NaN when the average range is 0)
+        rvi = np.divide(rolling_num, rolling_den, out=np.full(len(df), np.nan), where=rolling_den != 0)
         
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        # Prepare result, indexed by [trade_date, ts_code]
+        result = date_code_frame(df, {self.name: rvi})
         
         return result
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import date_code_frame
+from .rvi import compute_rvi, compute_rvi_signal
 
 class RVIDiffFactor(BaseFactor):
     """
@@ -50,71 +52,17 @@ class RVIDiffFactor(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def compute_diff_for_stock(group):
-            """Compute RVI diff for a single stock."""
-            open_prices = group['open'].values
-            high_prices = group['high'].values
-            low_prices = group['low'].values
-            close_prices = group['close'].values
-            
-            n = len(close_prices)
-            
-            # Calculate RVI
-            # Calculate RVI
-            range_hl = high_prices - low_prices
-            with np.errstate(divide='ignore', invalid='ignore'):
-                vigor = np.divide(
-                    close_prices - open_prices,
-                    range_hl,
-                    out=np.zeros_like(close_prices),
-                    where=range_hl != 0
-                )
-            
-            numerator = np.full(n, np.nan)
-            for i in range(3, n):
-                numerator[i] = (vigor[i-3] + 2*vigor[i-2] + 2*vigor[i-1] + vigor[i]) / 6
-            
-            denominator = np.full(n, np.nan)
-            for i in range(3, n):
-                denominator[i] = (range_hl[i-3] + 2*range_hl[i-2] + 2*range_hl[i-1] + range_hl[i]) / 6
-            
-            with np.errstate(divide='ignore', invalid='ignore'):
-                rvi = np.divide(
-                    numerator,
-                    denominator,
-                    out=np.full_like(numerator, np.nan),
-                    where=(denominator != 0) & (~np.isnan(denominator))
-                )
-            
-            # Calculate Signal line
-            signal = np.full(n, np.nan)
-            if self.signal_period == 4:
-                for i in range(3, n):
-                    if not np.isnan(rvi[i-3:i+1]).any():
-                        signal[i] = (rvi[i-3] + 2*rvi[i-2] + 2*rvi[i-1] + rvi[i]) / 6
-            else:
-                for i in range(self.signal_period-1, n):
-                    if not np.isnan(rvi[i-self.signal_period+1:i+1]).any():
-                        signal[i] = np.mean(rvi[i-self.signal_period+1:i+1])
-            
-            # Calculate difference
-            diff = rvi - signal
-            
-            return pd.Series(diff, index=group.index)
-        
-        # Calculate diff for each stock
-        diff_values = df.groupby('ts_code', group_keys=False).apply(compute_diff_for_stock)
+        # RVI and Signal line, shared with the other RVI factors through the frame cache
+        rvi = compute_rvi(df)
+        signal = compute_rvi_signal(df, self.signal_period)
         
-        # Prepare result
-        result = pd.DataFrame({
-            self.name: diff_values,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
+        # Calculate difference (RVI and signal stay float64, the spread needs no more than float32)
+        diff_values = (rvi - signal).astype(np.float32)
         
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        # Prepare result, indexed by [trade_date, ts_code]
+        result = date_code_frame(df, {self.name: diff_values})
         
         return result
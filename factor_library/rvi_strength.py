@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import date_code_frame, group_index, shift_sorted
+from .rvi import compute_rvi, compute_rvi_signal
 
 class RVIStrengthFactor(BaseFactor):
     """
@@ -52,88 +54,34 @@ class RVIStrengthFactor(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def compute_strength_for_stock(group):
-            """Compute RVI strength for a single stock."""
-            open_prices = group['open'].values
-            high_prices = group['high'].values
-            low_prices = group['low'].values
-            close_prices = group['close'].values
-            
-            n = len(close_prices)
-            
-            # Calculate RVI
-            # Calculate RVI
-            range_hl = high_prices - low_prices
-            with np.errstate(divide='ignore', invalid='ignore'):
-                vigor = np.divide(
-                    close_prices - open_prices,
-                    range_hl,
-                    out=np.zeros_like(close_prices),
-                    where=range_hl != 0
-                )
-            
-            numerator = np.full(n, np.nan)
-            for i in range(3, n):
-                numerator[i] = (vigor[i-3] + 2*vigor[i-2] + 2*vigor[i-1] + vigor[i]) / 6
-            
-            denominator = np.full(n, np.nan)
-            for i in range(3, n):
-                denominator[i] = (range_hl[i-3] + 2*range_hl[i-2] + 2*range_hl[i-1] + range_hl[i]) / 6
-            
-            with np.errstate(divide='ignore', invalid='ignore'):
-                rvi = np.divide(
-                    numerator,
-                    denominator,
-                    out=np.full_like(numerator, np.nan),
-                    where=(denominator != 0) & (~np.isnan(denominator))
-                )
-            
-            # Calculate Signal line
-            signal = np.full(n, np.nan)
-            if self.signal_period == 4:
-                for i in range(3, n):
-                    if not np.isnan(rvi[i-3:i+1]).any():
-                        signal[i] = (rvi[i-3] + 2*rvi[i-2] + 2*rvi[i-1] + rvi[i]) / 6
-            else:
-                for i in range(self.signal_period-1, n):
-                    if not np.isnan(rvi[i-self.signal_period+1:i+1]).any():
-                        signal[i] = np.mean(rvi[i-self.signal_period+1:i+1])
-            
-            # Calculate RVI change rate
-            rvi_change = np.zeros(n)
-            for i in range(1, n):
-                if not np.isnan(rvi[i]) and not np.isnan(rvi[i-1]) and rvi[i-1] != 0:
-                    rvi_change[i] = (rvi[i] - rvi[i-1]) / abs(rvi[i-1])
-                else:
-                    rvi_change[i] = 0
-            
-            # Detect crossover and record strength
-            strength = np.zeros(n)
-            for i in range(1, n):
-                if np.isnan(rvi[i]) or np.isnan(signal[i]) or np.isnan(rvi[i-1]) or np.isnan(signal[i-1]):
-                    strength[i] = 0
-                elif (rvi[i-1] <= signal[i-1] and rvi[i] > signal[i]) or \
-                     (rvi[i-1] >= signal[i-1] and rvi[i] < signal[i]):
-                    # Crossover occurred
-                    strength[i] = rvi_change[i]
-                else:
-                    strength[i] = 0
-            
-            return pd.Series(strength, index=group.index)
+        # RVI and Signal line, shared with the other RVI factors through the frame cache
+        rvi = compute_rvi(df)
+        signal = compute_rvi_signal(df, self.signal_period)
+        
+        # Previous day's values within each stock (NaN on its first day)
+        groups = group_index(df)
+        rvi_prev = shift_sorted(rvi, 1, groups)
+        signal_prev = shift_sorted(signal, 1, groups)
         
-        # Calculate strength for each stock
-        strength_values = df.groupby('ts_code', group_keys=False).apply(compute_strength_for_stock)
+        # Calculate RVI change rate (0 when either day is missing or the base is 0)
+        rvi_change = np.zeros(len(df))
+        np.divide(
+            rvi - rvi_prev,
+            np.abs(rvi_prev),
+            out=rvi_change,
+            where=(rvi_prev != 0) & ~np.isnan(rvi_prev) & ~np.isnan(rvi)
+        )
         
-        # Prepare result
-        result = pd.DataFrame({
-            self.name: strength_values,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
+        # Detect crossover and record strength (comparisons with NaN are False)
+        crossed = ((rvi_prev <= signal_prev) & (rvi > signal)) | \
+                  ((rvi_prev >= signal_prev) & (rvi < signal))
+        # The change rate is computed in float64, the stored strength needs no more than float32
+        strength_values = np.where(crossed, rvi_change, 0.0).astype(np.float32)
         
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        # Prepare result, indexed by [trade_date, ts_code]
+        result = date_code_frame(df, {self.name: strength_values})
         
         return result
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import date_code_frame, group_index, rolling_sorted, shift_sorted
+from .rvi import compute_rvi, compute_rvi_signal
 
 class RVITrendFactor(BaseFactor):
     """
@@ -57,92 +59,31 @@ class RVITrendFactor(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def compute_rvi_trend_for_stock(group):
-            """Compute RVI-Trend for a single stock."""
-            open_prices = group['open'].values
-            high_prices = group['high'].values
-            low_prices = group['low'].values
-            close_prices = group['close'].values
-            
-            n = len(close_prices)
-            
-            # Calculate RVI
-            # Calculate RVI
-            range_hl = high_prices - low_prices
-            with np.errstate(divide='ignore', invalid='ignore'):
-                vigor = np.divide(
-                    close_prices - open_prices,
-                    range_hl,
-                    out=np.zeros_like(close_prices),
-                    where=range_hl != 0
-                )
-            
-            numerator = np.full(n, np.nan)
-            for i in range(3, n):
-                numerator[i] = (vigor[i-3] + 2*vigor[i-2] + 2*vigor[i-1] + vigor[i]) / 6
-            
-            denominator = np.full(n, np.nan)
-            for i in range(3, n):
-                denominator[i] = (range_hl[i-3] + 2*range_hl[i-2] + 2*range_hl[i-1] + range_hl[i]) / 6
-            
-            with np.errstate(divide='ignore', invalid='ignore'):
-                rvi = np.divide(
-                    numerator,
-                    denominator,
-                    out=np.full_like(numerator, np.nan),
-                    where=(denominator != 0) & (~np.isnan(denominator))
-                )
-            
-            # Calculate Signal line
-            signal = np.full(n, np.nan)
-            if self.signal_period == 4:
-                for i in range(3, n):
-                    if not np.isnan(rvi[i-3:i+1]).any():
-                        signal[i] = (rvi[i-3] + 2*rvi[i-2] + 2*rvi[i-1] + rvi[i]) / 6
-            else:
-                for i in range(self.signal_period-1, n):
-                    if not np.isnan(rvi[i-self.signal_period+1:i+1]).any():
-                        signal[i] = np.mean(rvi[i-self.signal_period+1:i+1])
-            
-            # Calculate price MA
-            price_ma = np.full(n, np.nan)
-            for i in range(self.trend_ma_period-1, n):
-                price_ma[i] = np.mean(close_prices[i-self.trend_ma_period+1:i+1])
-            
-            # Detect golden cross and combine with trend
-            factor = np.zeros(n)
-            for i in range(1, n):
-                if np.isnan(rvi[i]) or np.isnan(signal[i]) or \
-                   np.isnan(rvi[i-1]) or np.isnan(signal[i-1]) or \
-                   np.isnan(price_ma[i]) or price_ma[i] == 0:
-                    factor[i] = 0
-                elif rvi[i-1] <= signal[i-1] and rvi[i] > signal[i]:
-                    # Golden cross occurred
-                    if close_prices[i] > price_ma[i]:
-                        # Trend confirmation
-                        price_strength = (close_prices[i] - price_ma[i]) / price_ma[i]
-                        factor[i] = rvi[i] * (1 + price_strength)
-                    else:
-                        # Against trend
-                        factor[i] = 0
-                else:
-                    factor[i] = 0
-            
-            return pd.Series(factor, index=group.index)
+        # RVI and Signal line, shared with the other RVI factors through the frame cache
+        rvi = compute_rvi(df)
+        signal = compute_rvi_signal(df, self.signal_period)
+        
+        # Calculate price MA and the previous day's RVI/Signal within each stock
+        groups = group_index(df)
+        close_prices = df['close'].to_numpy(dtype=np.float64)
+        price_ma = rolling_sorted(close_prices, groups, self.trend_ma_period, 'mean')
+        rvi_prev = shift_sorted(rvi, 1, groups)
+        signal_prev = shift_sorted(signal, 1, groups)
         
-        # Calculate RVI-Trend for each stock
-        factor_values = df.groupby('ts_code', group_keys=False).apply(compute_rvi_trend_for_stock)
+        # Golden cross confirmed by price above its MA (comparisons with NaN are
+        # False, so missing values and the first day of a stock give 0)
+        golden = (rvi_prev <= signal_prev) & (rvi > signal)
+        confirmed = golden & (price_ma != 0) & (close_prices > price_ma)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_strength = (close_prices - price_ma) / price_ma
         
-        # Prepare result
-        result = pd.DataFrame({
-            self.name: factor_values,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
+        # RVI and the price MA stay float64, the stored factor needs no more than float32
+        factor_values = np.where(confirmed, rvi * (1 + price_strength), 0.0).astype(np.float32)
         
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        # Prepare result, indexed by [trade_date, ts_code]
+        result = date_code_frame(df, {self.name: factor_values})
         
         return result
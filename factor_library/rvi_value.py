@@ -1,6 +1,7 @@
 import pandas as pd
-import numpy as np
 from .base_factor import BaseFactor
+from ._utils import date_code_frame
+from .rvi import compute_rvi
 
 class RVIValueFactor(BaseFactor):
     """
@@ -44,59 +45,14 @@ class RVIValueFactor(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def compute_rvi_for_stock(group):
-            """Compute RVI for a single stock."""
-            open_prices = group['open'].values
-            high_prices = group['high'].values
-            low_prices = group['low'].values
-            close_prices = group['close'].values
-            
-            n = len(close_prices)
-            
-            # Step 1: Calculate Vigor
-            range_hl = high_prices - low_prices
-            with np.errstate(divide='ignore', invalid='ignore'):
-                vigor = np.divide(
-                    close_prices - open_prices,
-                    range_hl,
-                    out=np.zeros_like(close_prices),
-                    where=range_hl != 0
-                )
-            
-            # Step 2: Calculate Numerator (WMA of Vigor)
-            numerator = np.full(n, np.nan)
-            for i in range(3, n):
-                numerator[i] = (vigor[i-3] + 2*vigor[i-2] + 2*vigor[i-1] + vigor[i]) / 6
-            
-            # Step 3: Calculate Denominator (WMA of Range)
-            denominator = np.full(n, np.nan)
-            for i in range(3, n):
-                denominator[i] = (range_hl[i-3] + 2*range_hl[i-2] + 2*range_hl[i-1] + range_hl[i]) / 6
-            
-            # Step 4: Calculate RVI
-            with np.errstate(divide='ignore', invalid='ignore'):
-                rvi = np.divide(
-                    numerator,
-                    denominator,
-                    out=np.full_like(numerator, np.nan),
-                    where=(denominator != 0) & (~np.isnan(denominator))
-                )
-            
-            return pd.Series(rvi, index=group.index)
-        
-        # Calculate RVI for each stock
-        rvi_values = df.groupby('ts_code', group_keys=False).apply(compute_rvi_for_stock)
-        
-        # Prepare result
-        result = pd.DataFrame({
-            self.name: rvi_values,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
+        # RVI for the whole panel in one pass (first 3 days of every stock masked),
+        # shared with the other RVI factors through the frame cache
+        rvi_values = compute_rvi(df)
         
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        # Prepare result, indexed by [trade_date, ts_code]
+        result = date_code_frame(df, {self.name: rvi_values})
         
         return result
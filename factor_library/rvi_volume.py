@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import date_code_frame, group_index, rolling_sorted, shift_sorted
+from .rvi import compute_rvi, compute_rvi_signal
 
 class RVIVolumeFactor(BaseFactor):
     """
@@ -57,92 +59,29 @@ class RVIVolumeFactor(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # Ensure sorted (skipped when the panel is already in order)
+        df = self._ensure_sorted(df)
         
-        def compute_rvi_volume_for_stock(group):
-            """Compute RVI-Volume for a single stock."""
-            open_prices = group['open'].values
-            high_prices = group['high'].values
-            low_prices = group['low'].values
-            close_prices = group['close'].values
-            volume = group['vol'].values
-            
-            n = len(close_prices)
-            
-            # Calculate RVI
-            range_hl = high_prices - low_prices
-            with np.errstate(divide='ignore', invalid='ignore'):
-                vigor = np.divide(
-                    close_prices - open_prices,
-                    range_hl,
-                    out=np.zeros_like(close_prices),
-                    where=range_hl != 0
-                )
-            
-            numerator = np.full(n, np.nan)
-            for i in range(3, n):
-                numerator[i] = (vigor[i-3] + 2*vigor[i-2] + 2*vigor[i-1] + vigor[i]) / 6
-            
-            denominator = np.full(n, np.nan)
-            for i in range(3, n):
-                denominator[i] = (range_hl[i-3] + 2*range_hl[i-2] + 2*range_hl[i-1] + range_hl[i]) / 6
-            
-            with np.errstate(divide='ignore', invalid='ignore'):
-                rvi = np.divide(
-                    numerator,
-                    denominator,
-                    out=np.full_like(numerator, np.nan),
-                    where=(denominator != 0) & (~np.isnan(denominator))
-                )
-            
-            # Calculate Signal line
-            signal = np.full(n, np.nan)
-            if self.signal_period == 4:
-                for i in range(3, n):
-                    if not np.isnan(rvi[i-3:i+1]).any():
-                        signal[i] = (rvi[i-3] + 2*rvi[i-2] + 2*rvi[i-1] + rvi[i]) / 6
-            else:
-                for i in range(self.signal_period-1, n):
-                    if not np.isnan(rvi[i-self.signal_period+1:i+1]).any():
-                        signal[i] = np.mean(rvi[i-self.signal_period+1:i+1])
-            
-            # Calculate volume MA
-            volume_ma = np.full(n, np.nan)
-            for i in range(self.volume_ma_period-1, n):
-                volume_ma[i] = np.mean(volume[i-self.volume_ma_period+1:i+1])
-            
-            # Detect golden cross and combine with volume
-            factor = np.zeros(n)
-            for i in range(1, n):
-                if np.isnan(rvi[i]) or np.isnan(signal[i]) or \
-                   np.isnan(rvi[i-1]) or np.isnan(signal[i-1]) or \
-                   np.isnan(volume_ma[i]) or volume_ma[i] == 0:
-                    factor[i] = 0
-                elif rvi[i-1] <= signal[i-1] and rvi[i] > signal[i]:
-                    # Golden cross occurred
-                    if volume[i] > volume_ma[i]:
-                        # Volume confirmation
-                        volume_ratio = volume[i] / volume_ma[i]
-                        factor[i] = rvi[i] * volume_ratio
-                    else:
-                        # No volume confirmation
-                        factor[i] = 0
-                else:
-                    factor[i] = 0
-            
-            return pd.Series(factor, index=group.index)
+        # RVI and Signal line, shared with the other RVI factors through the frame cache
+        rvi = compute_rvi(df)
+        signal = compute_rvi_signal(df, self.signal_period)
         
-        # Calculate RVI-Volume for each stock
-        factor_values = df.groupby('ts_code', group_keys=False).apply(compute_rvi_volume_for_stock)
+        # Calculate volume MA and the previous day's RVI/Signal within each stock
+        groups = group_index(df)
+        volume = df['vol'].to_numpy(dtype=np.float64)
+        volume_ma = rolling_sorted(volume, groups, self.volume_ma_period, 'mean')
+        rvi_prev = shift_sorted(rvi, 1, groups)
+        signal_prev = shift_sorted(signal, 1, groups)
         
-        # Prepare result
-        result = pd.DataFrame({
-            self.name: factor_values,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
+        # Golden cross confirmed by volume above its MA (comparisons with NaN are
+        # False, so missing values and the first day of a stock give 0)
+        golden = (rvi_prev <= signal_prev) & (rvi > signal)
+        confirmed = golden & (volume_ma != 0) & (volume > volume_ma)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = volume / volume_ma
+        factor_values = np.where(confirmed, rvi * volume_ratio, 0.0)
         
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        # Prepare result, indexed by [trade_date, ts_code]
+        result = date_code_frame(df, {self.name: factor_values})
         
         return result
@@ -8,6 +8,7 @@ project_root = Path.cwd().parent.parent
 sys.path.insert(0, str(project_root))
 
 from factor_library.base_factor import BaseFactor
+from factor_library._utils import date_code_frame, group_index, shift_sorted
 
 
 class ShortTermReversal(BaseFactor):
@@ -55,38 +56,26 @@ class ShortTermReversal(BaseFactor):
         """
         self.check_dependencies(df)
         
-        # 创建副本避免修改原始数据
-        df = df.copy()
-        
-        # 按股票代码和交易日期排序
-        df = df.sort_values(['ts_code', 'trade_date'])
+        # 按股票代码和交易日期排序 (已排序时跳过; 只读取列,不修改原始数据,无需副本)
+        df = self._ensure_sorted(df)
         
         # 计算period期的收益率: (P_t - P_{t-period}) / P_{t-period}
-        # 使用shift获取period天前的价格
-        df['prev_close'] = df.groupby('ts_code')['close'].shift(self.period)
+        # 数据已按股票排序,按位置平移period行,并屏蔽每只股票前period行 (无需 groupby.shift)
+        close = df['close'].to_numpy(dtype=np.float64)
+        prev_close = shift_sorted(close, self.period, group_index(df))
         
         # 计算收益率
-        returns = (df['close'] - df['prev_close']) / df['prev_close']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = (close - prev_close) / prev_close
         
         # 短期反转策略：收益率取负值（做多表现差的，做空表现好的）
         # 这样：负收益率（下跌）→ 正因子值（买入信号）
         #      正收益率（上涨）→ 负因子值（卖出信号）
-        str_value = -returns
-        
         # 处理异常值：过滤掉极端收益率（可能是数据错误）
-        # 例如：日收益率超过±50%可能是异常值
-        str_value = str_value.where(
-            (returns.abs() <= 0.5) | returns.isna(),
-            np.nan
-        )
+        # 例如：日收益率超过±50%可能是异常值 (比较对 NaN 为 False,缺失值保持 NaN)
+        str_value = np.where(np.abs(returns) <= 0.5, -returns, np.nan)
         
         # 构建结果
-        result = pd.DataFrame({
-            self.name: str_value,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
-        
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        result = date_code_frame(df, {self.name: str_value})
         
         return result
\ No newline at end of file
@@ -22,25 +22,26 @@ class StandardizedFinancialDebtChangeRatio(BaseFactor):
     def calculate(self, df: pd.DataFrame) -> pd.DataFrame:
         self.check_dependencies(df)
 
-        # Calculate current financial liabilities
-        current_financial_liabilities = (df['st_borr'].fillna(0) + df['trading_fl'].fillna(0) + df['notes_payable'].fillna(0) +
-                                         df['non_cur_liab_due_1y'].fillna(0) + df['lt_borr'].fillna(0) + df['bond_payable'].fillna(0))
+        # Calculate current financial liabilities (missing items count as 0),
+        # as one row sum over a single float64 block of the six items
+        liabilities = df[['st_borr', 'trading_fl', 'notes_payable', 'non_cur_liab_due_1y', 'lt_borr',
+                          'bond_payable']].to_numpy(dtype=np.float64, na_value=np.nan)
+        current_financial_liabilities = np.nan_to_num(liabilities, nan=0.0).sum(axis=1)
 
-        # Calculate previous year's financial liabilities
-        previous_year_financial_liabilities = (df['st_borr'].shift(4).fillna(0) + df['trading_fl'].shift(4).fillna(0) +
-                                               df['notes_payable'].shift(4).fillna(0) + df['non_cur_liab_due_1y'].shift(4).fillna(0) +
-                                               df['lt_borr'].shift(4).fillna(0) + df['bond_payable'].shift(4).fillna(0))
+        # Calculate previous year's financial liabilities: the same sum 4 rows back,
+        # 0 for the first 4 rows
+        previous_year_financial_liabilities = np.zeros(len(df))
+        previous_year_financial_liabilities[4:] = current_financial_liabilities[:-4]
 
         # Calculate average total assets
-        avg_total_assets = (df['total_assets'] + df['total_assets'].shift(1)) / 2
+        total_assets = df['total_assets'].to_numpy(dtype=np.float64, na_value=np.nan)
+        avg_total_assets = np.full(len(df), np.nan)
+        avg_total_assets[1:] = (total_assets[1:] + total_assets[:-1]) / 2
 
         # Standardize the change in financial liabilities
-        standardized_change_in_financial_liabilities = (
-                                                                   current_financial_liabilities - previous_year_financial_liabilities) / avg_total_assets
-
-        # Ensure numeric
-        standardized_change_in_financial_liabilities = pd.to_numeric(standardized_change_in_financial_liabilities,
-                                                                     errors='coerce')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            standardized_change_in_financial_liabilities = (
+                current_financial_liabilities - previous_year_financial_liabilities) / avg_total_assets
 
         result = pd.DataFrame({
             self.name: standardized_change_in_financial_liabilities,
@@ -27,8 +27,11 @@ class StandardizedOperatingProfit(BaseFactor):
         operating_profit_ttm = df['op_income']
 
         # Calculate the mean and std for the last T quarters (rolling window)
-        rolling_mean = df['op_income'].shift(1).rolling(T).mean()  # Shift to exclude current quarter
-        rolling_std = df['op_income'].shift(1).rolling(T).std()  # Shift to exclude current quarter
+        # (per stock, so that no window spans two companies)
+        prev_op_income = df.groupby('ts_code', sort=False)['op_income'].shift(1)  # Shift to exclude current quarter
+        prev_rolling = prev_op_income.groupby(df['ts_code'], sort=False).rolling(T)
+        rolling_mean = prev_rolling.mean().reset_index(level=0, drop=True)
+        rolling_std = prev_rolling.std().reset_index(level=0, drop=True)
 
         # Standardized Operating Profit
         standardized_operating_profit = (operating_profit_ttm - rolling_mean) / rolling_std
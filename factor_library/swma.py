@@ -2,6 +2,11 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import date_code_frame, group_index, sliding_wma_sorted
+
+# Normalised 5-period sine weights, built once at import
+_SINE_WEIGHTS = np.array([0.5, 0.8660254, 1.0, 0.8660254, 0.5])
+_SINE_WEIGHTS = _SINE_WEIGHTS / _SINE_WEIGHTS.sum()
 
 class SineWMA(BaseFactor):
     """
@@ -32,7 +37,7 @@ class SineWMA(BaseFactor):
         self.check_dependencies(df)
         
         # Ensure sorted
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         # Define weights for 5-period sine WMA
         # sin(i * pi / (N+1)) for i=1 to N
@@ -43,44 +48,18 @@ class SineWMA(BaseFactor):
         # i=4: sin(4pi/6) = 0.866
         # i=5: sin(5pi/6) = 0.5
         
-        weights = np.array([0.5, 0.8660254, 1.0, 0.8660254, 0.5])
-        weights = weights / weights.sum()
-        
         # Calculate WMA
-        # We can use rolling().apply() but it's slow.
-        # Faster: sum of shifted series multiplied by weights.
         # SWMA_t = w1*P_{t-4} + w2*P_{t-3} + w3*P_{t-2} + w4*P_{t-1} + w5*P_t
-        # Note: rolling apply usually takes window ending at t.
-        # So weights should be applied to [t-4, t-3, t-2, t-1, t].
-        # Our weights array is symmetric so order doesn't matter for symmetry, but conceptually:
         # weights[0] applies to t-4 (oldest), weights[4] applies to t (newest).
-        
-        close = df['close']
-        swma = pd.Series(0.0, index=df.index)
-        
-        # Groupby shift is safer
-        shifts = []
-        for i in range(5):
-            # shift(4-i):
-            # i=0: shift(4) -> t-4
-            # i=4: shift(0) -> t
-            shifts.append(df.groupby('ts_code')['close'].shift(4-i))
-            
-        # Weighted sum
-        weighted_sum = sum(s * w for s, w in zip(shifts, weights))
-        
-        swma = weighted_sum
+        # One dot product of every 5-day window of the sorted panel with the
+        # weights; windows that start in the previous stock are masked out.
+        close = df['close'].to_numpy(dtype=np.float64)
+        swma = sliding_wma_sorted(close, _SINE_WEIGHTS, group_index(df))
         
         # Factor: Close - SWMA
-        factor_value = df['close'] - swma
+        factor_value = close - swma
         
         # Prepare result
-        result = pd.DataFrame({
-            self.name: factor_value,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
-        
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        result = date_code_frame(df, {self.name: factor_value})
         
         return result
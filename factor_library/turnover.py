@@ -2,6 +2,7 @@
 import pandas as pd
 import numpy as np
 from .base_factor import BaseFactor
+from ._utils import date_code_frame, group_index, rolling_sorted
 
 class Turnover(BaseFactor):
     """
@@ -29,20 +30,15 @@ class Turnover(BaseFactor):
         """
         self.check_dependencies(df)
         
-        df = df.sort_values(['ts_code', 'trade_date'])
+        df = self._ensure_sorted(df)
         
         window = 20 # Approx 1 month
         
-        # Rolling mean
-        tur = df.groupby('ts_code')['turnover_rate'].rolling(window).mean().reset_index(0, drop=True)
+        # Rolling mean: one pass over the sorted panel, windows crossing
+        # into the previous stock masked out
+        tur = rolling_sorted(df['turnover_rate'].to_numpy(dtype=np.float64), group_index(df), window, 'mean')
         
         # Result
-        result = pd.DataFrame({
-            self.name: tur,
-            'trade_date': df['trade_date'],
-            'ts_code': df['ts_code']
-        })
-        
-        result = result.set_index(['trade_date', 'ts_code']).sort_index()
+        result = date_code_frame(df, {self.name: tur})
         
         return result
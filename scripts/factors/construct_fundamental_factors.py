@@ -168,14 +168,16 @@ def construct_factors():
     
     if cols_to_convert:
         print(f"需要转换的列数: {len(cols_to_convert)}")
-        # 必须循环处理每一列，因为 convert_ytd_to_ttm 一次只接受一个字符串列名
-        for i, col in enumerate(cols_to_convert):
-            if i % 5 == 0:
-                print(f"  正在处理第 {i+1}/{len(cols_to_convert)} 列: {col} ...")
-            try:
-                financial_df = convert_ytd_to_ttm(financial_df, col)
-            except Exception as e:
-                print(f"  转换列 {col} 失败: {e}")
+        # 一次性转换所有列：排序、季度提取和分组只做一遍，下游因子直接读取 TTM 列
+        try:
+            financial_df = convert_ytd_to_ttm(financial_df, cols_to_convert)
+        except Exception as e:
+            print(f"  批量转换失败，逐列重试: {e}")
+            for col in cols_to_convert:
+                try:
+                    financial_df = convert_ytd_to_ttm(financial_df, col)
+                except Exception as e:
+                    print(f"  转换列 {col} 失败: {e}")
                 
         # 批量重命名：将原始列改为 _ytd，将 _ttm 列改为原始列名
         # 这样下游因子计算代码（如 n_income）不需要改名就能直接用上 TTM 数据
@@ -101,6 +101,8 @@ def construct_technical_factors():
     # Ensure types
     df['trade_date'] = pd.to_datetime(df['trade_date'].astype(str))
     df = df.sort_values(['ts_code', 'trade_date'])
+    # Categorical ts_code: groupby and group-boundary scans work on int codes instead of strings
+    df['ts_code'] = df['ts_code'].astype('category')
     
     # 2. Calculate Factors
     factors = [
@@ -181,11 +183,25 @@ def construct_technical_factors():
         return
         
     # Merge on index
-    tech_df = pd.concat(results, axis=1)
+    # All factors come from the same sorted panel, so they normally share one
+    # [trade_date, ts_code] index: collect their columns against it and build a
+    # single frame instead of aligning K frames in pd.concat
+    shared_index = results[0].index
+    for res in results[1:]:
+        if not res.index.equals(shared_index):
+            shared_index = shared_index.union(res.index)
+    columns = {}
+    for res in results:
+        if not res.index.equals(shared_index):
+            res = res.reindex(shared_index)
+        for col in res.columns:
+            columns[col] = res[col].to_numpy()
+    tech_df = pd.DataFrame(columns, index=shared_index)
     
     # 4. Resample to Weekly (Friday)
     print("Resampling to weekly (Friday)...")
     tech_df = tech_df.reset_index()
+    tech_df['ts_code'] = tech_df['ts_code'].astype(str)
     tech_df['week'] = tech_df['trade_date'].dt.to_period('W-FRI')
     
     # We take the last value of the week for each stock
@@ -1,7 +1,8 @@
 import pandas as pd
 import numpy as np
+from typing import List, Union
 
-def convert_ytd_to_ttm(df: pd.DataFrame, value_col: str, date_col: str = 'end_date', code_col: str = 'ts_code') -> pd.DataFrame:
+def convert_ytd_to_ttm(df: pd.DataFrame, value_col: Union[str, List[str]], date_col: str = 'end_date', code_col: str = 'ts_code') -> pd.DataFrame:
     """
     Convert Year-to-Date (YTD) financial data to Trailing Twelve Months (TTM).
     
@@ -13,79 +14,51 @@ def convert_ytd_to_ttm(df: pd.DataFrame, value_col: str, date_col: str = 'end_da
        - Q2-Q4: SQ_t = YTD_t - YTD_{t-1} (if same year)
     4. Calculate TTM: Rolling sum of last 4 SQ values.
     
+    Several columns can be converted at once; the copy, sort and quarter
+    extraction are then done a single time and the groupby shift/rolling
+    run over all columns together.
+    
     Args:
         df: Input DataFrame containing YTD data.
-        value_col: Name of the column with YTD values.
+        value_col: Name (or list of names) of the column(s) with YTD values.
         date_col: Name of the date column (default 'end_date').
         code_col: Name of the stock code column (default 'ts_code').
         
     Returns:
-        DataFrame with an additional '{value_col}_ttm' column.
+        DataFrame with an additional '{value_col}_ttm' column per converted column.
     """
+    value_cols = [value_col] if isinstance(value_col, str) else list(value_col)
+    
     df = df.copy()
     df[date_col] = pd.to_datetime(df[date_col])
     df = df.sort_values([code_col, date_col])
     
     # Extract Quarter
-    df['quarter'] = df[date_col].dt.quarter
-    df['year'] = df[date_col].dt.year
+    quarter = df[date_col].dt.quarter
+    year = df[date_col].dt.year
     
     # Calculate Single Quarter (SQ) Value
-    # We need to shift within the same group (stock) to get previous period's YTD
-    # However, we must ensure we are subtracting the correct previous quarter in the same year.
-    
-    # Group by stock and year to handle YTD subtraction safely
-    # For Q1, SQ is just YTD. For others, it's YTD - prev_YTD
-    
-    # Create a shifted column for the previous record
-    df['prev_ytd'] = df.groupby([code_col, 'year'])[value_col].shift(1)
-    df['prev_quarter'] = df.groupby([code_col, 'year'])['quarter'].shift(1)
-    
-    # Initialize SQ with YTD
-    df['sq_value'] = df[value_col]
-    
-    # If not Q1, subtract previous YTD if it exists and is the immediate previous quarter
-    # Note: Chinese reports are usually Q1, Q2 (Semi), Q3, Q4 (Annual).
-    # Sometimes Q3 is missing or Q1 is missing, but usually they are consistent.
-    # Standard logic: SQ = YTD - Prev_YTD if Prev_YTD is from the same year.
-    
-    mask_not_q1 = df['quarter'] > 1
-    # We only subtract if we have the previous record in the same year
-    # If data is missing (e.g. have Q2 but missing Q1), we might have issues.
-    # Assuming standard data quality for now, but being robust:
-    
-    # Calculate SQ:
-    # If Q1: SQ = YTD (Already set)
-    # If Q > 1: SQ = YTD - Prev_YTD (where Prev_YTD is valid)
-    
-    # A safer way using diff() within year groups might be better, but let's be explicit
-    df.loc[mask_not_q1, 'sq_value'] = df.loc[mask_not_q1, value_col] - df.loc[mask_not_q1, 'prev_ytd'].fillna(0)
-    
-    # Handle edge case: If Q2 exists but Q1 is missing in data, 'prev_ytd' will be NaN.
-    # In that case, SQ for Q2 would be YTD(Q2) - 0 = YTD(Q2), which is WRONG (it would be H1).
-    # But without Q1 data, we can't know Q2 SQ.
-    # Ideally we should set to NaN if prev_ytd is NaN and it's not Q1.
-    
-    mask_missing_prev = (df['quarter'] > 1) & (df['prev_ytd'].isna())
-    df.loc[mask_missing_prev, 'sq_value'] = np.nan
+    # Shift within the same (stock, year) group so that Q2-Q4 subtract the
+    # previous YTD of the same fiscal year.
+    ytd = df[value_cols]
+    prev_ytd = ytd.groupby([df[code_col], year]).shift(1)
+    
+    # If Q1: SQ = YTD
+    # If Q > 1: SQ = YTD - Prev_YTD
+    # If Q2 exists but Q1 is missing in data, 'prev_ytd' is NaN and SQ cannot
+    # be recovered, so it is set to NaN.
+    is_q1 = (quarter == 1).to_numpy()
+    sq_value = ytd.where(np.broadcast_to(is_q1[:, None], ytd.shape), ytd - prev_ytd)
     
     # Now Calculate TTM: Rolling sum of last 4 SQ values
-    # We need to roll over the stock, ignoring year boundaries (TTM crosses years)
-    
-    # We must ensure the rolling window covers 4 consecutive quarters.
-    # Simple rolling(4).sum() works if data is dense (no missing quarters).
-    # If quarters are missing, rolling(4) might take Q4(2020), Q4(2019), etc.
-    # For robust TTM, we usually just take rolling sum and assume data density,
-    # or we can reindex to fill missing quarters.
-    # Given the "Critical" nature, let's stick to rolling sum but maybe warn or check dates?
-    # For this refactor, standard rolling(4) on sorted SQ is the standard approach.
+    # We need to roll over the stock, ignoring year boundaries (TTM crosses years).
+    # Simple rolling(4).sum() assumes data density (no missing quarters).
+    ttm = sq_value.groupby(df[code_col]).rolling(window=4, min_periods=4).sum().reset_index(level=0, drop=True)
     
-    df[f'{value_col}_ttm'] = df.groupby(code_col)['sq_value'].transform(
-        lambda x: x.rolling(window=4, min_periods=4).sum()
-    )
+    for col in value_cols:
+        df[f'{col}_ttm'] = ttm[col]
     
-    # Cleanup temporary columns
-    return df.drop(columns=['quarter', 'year', 'prev_ytd', 'prev_quarter', 'sq_value'])
+    return df
 
 def calculate_yoy_growth(df: pd.DataFrame, value_col: str, date_col: str = 'end_date', code_col: str = 'ts_code') -> pd.DataFrame:
     """